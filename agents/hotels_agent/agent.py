@@ -1,10 +1,11 @@
 from dotenv import load_dotenv
 from google.adk.agents import Agent
-from toolbox_core import ToolboxSyncClient
-toolbox = ToolboxSyncClient("http://127.0.0.1:5000")
+from helpers.admission import throttle_model_call
+from helpers.compaction import compact_history, record_usage
+from helpers.metrics import record_model_metrics, start_model_timer
+from helpers.toolbox import SharedToolboxToolset
 
-toolset = toolbox.load_toolset('hotels_toolset')
-individual_tools = [tool for tool in toolset]
+toolset = SharedToolboxToolset('hotels_toolset')
 
 hotels_agent = Agent(
     name="hotels_agent",
@@ -33,5 +34,7 @@ Your process should be as follows:
 
 **Fallback**: If a user's query is outside hotel operations, respond with: "I specialize in hotel-related services including searching by name, location, price range, and providing amenity information. Please provide a hotel-related query for me to assist you."
 """,
-    tools=individual_tools
+    tools=[toolset],
+    before_model_callback=[compact_history, throttle_model_call, start_model_timer],
+    after_model_callback=[record_usage, record_model_metrics],
 )
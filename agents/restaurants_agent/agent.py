@@ -1,10 +1,11 @@
 from dotenv import load_dotenv
 from google.adk.agents import Agent
-from toolbox_core import ToolboxSyncClient
-toolbox = ToolboxSyncClient("http://127.0.0.1:5000")
+from helpers.admission import throttle_model_call
+from helpers.compaction import compact_history, record_usage
+from helpers.metrics import record_model_metrics, start_model_timer
+from helpers.toolbox import SharedToolboxToolset
 
-toolset = toolbox.load_toolset('restaurants_toolset')
-individual_tools = [tool for tool in toolset]
+toolset = SharedToolboxToolset('restaurants_toolset')
 
 restaurants_agent = Agent(
     name="restaurants_agent",
@@ -33,5 +34,7 @@ Your process should be as follows:
 
 **Fallback**: If a user's query is outside restaurant operations, respond with: "I specialize in restaurant and dining services including searching by cuisine type, location, and providing menu information. Please provide a dining-related query for me to assist you."
 """,
-    tools=individual_tools
+    tools=[toolset],
+    before_model_callback=[compact_history, throttle_model_call, start_model_timer],
+    after_model_callback=[record_usage, record_model_metrics],
 )
@@ -0,0 +1,73 @@
+"""Offline benchmark for firebase.firebase_functions.authenticateUser.
+
+    python -m benchmarks.auth_bench --requests 2000 --users 200 --concurrency 50
+
+Compares the legacy path (blocking sign-in on every request) against the
+async, cached path using FakeAuthBackend, and reports cache hit rate,
+per-call latency and event-loop lag.
+"""
+import argparse
+import asyncio
+import json
+import random
+
+from benchmarks.common import LoopLagMonitor, Timer, summarize
+from firebase.fake_auth import FakeAuthBackend
+from firebase.firebase_functions import AuthCache
+
+
+class _NoCache:
+    def __init__(self, backend):
+        self.backend = backend
+
+    async def get(self, phone_number):
+        uid, id_token, _exp = await self.backend.sign_in(phone_number)
+        return uid, id_token
+
+    def stats(self):
+        return {}
+
+
+async def _run(auth, phone_numbers, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(phone_number):
+        async with semaphore:
+            with Timer() as t:
+                await auth.get(phone_number)
+            latencies.append(t.elapsed)
+
+    with LoopLagMonitor() as lag, Timer() as total:
+        await asyncio.gather(*(one(p) for p in phone_numbers))
+    return {
+        "req_per_s": len(phone_numbers) / total.elapsed,
+        "latency": summarize(latencies),
+        "loop_lag": summarize(lag.samples),
+        "cache": auth.stats(),
+    }
+
+
+async def main(args):
+    rng = random.Random(args.seed)
+    users = [f"+1555{i:07d}" for i in range(args.users)]
+    # Skewed traffic: a few users send most of the requests.
+    phone_numbers = rng.choices(users, weights=[1 / (i + 1) for i in range(len(users))], k=args.requests)
+
+    legacy = _NoCache(FakeAuthBackend(latency=args.latency, blocking=True))
+    cached = AuthCache(FakeAuthBackend(latency=args.latency))
+    results = {
+        "legacy_blocking": await _run(legacy, phone_numbers, args.concurrency),
+        "async_cached": await _run(cached, phone_numbers, args.concurrency),
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--seed", type=int, default=0)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,58 @@
+import asyncio
+import time
+
+
+def percentile(samples, pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(samples) -> dict:
+    return {
+        "count": len(samples),
+        "p50_ms": percentile(samples, 50) * 1000,
+        "p95_ms": percentile(samples, 95) * 1000,
+        "p99_ms": percentile(samples, 99) * 1000,
+        "max_ms": max(samples) * 1000 if samples else 0.0,
+    }
+
+
+class LoopLagMonitor:
+    """Measures event-loop lag by scheduling a short sleep and timing how late it wakes up."""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.samples = []
+        self._task = None
+        self._tick_start = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            self._tick_start = loop.time()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, loop.time() - self._tick_start - self.interval))
+
+    def __enter__(self):
+        self._tick_start = asyncio.get_running_loop().time()
+        self._task = asyncio.ensure_future(self._run())
+        return self
+
+    def __exit__(self, *exc):
+        # A loop that was blocked for the whole run never woke the ticker; count that stall too.
+        overdue = asyncio.get_running_loop().time() - self._tick_start - self.interval
+        if overdue > 0:
+            self.samples.append(overdue)
+        self._task.cancel()
+
+
+class Timer:
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = time.perf_counter() - self.start
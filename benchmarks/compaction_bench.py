@@ -0,0 +1,61 @@
+"""Memory and prompt size of a long conversation with and without compaction.
+
+    python -m benchmarks.compaction_bench [--turns 60] [--window 30]
+
+Runs one session through a real Runner with a ScriptedLlm and reports the
+stored session size and the estimated prompt tokens of the last model call.
+"""
+import argparse
+import asyncio
+import json
+
+from google.adk.agents import Agent
+from google.adk.runners import Runner
+from google.genai import types
+
+import helpers.compaction as compaction
+from benchmarks.fakes import ScriptedLlm, text_response
+
+APP_NAME = compaction.APP_NAME
+
+
+async def run(turns: int, window: int) -> dict:
+    compaction.SESSION_WINDOW_EVENTS = window
+    compaction.session_stats = compaction.SessionStats()
+    prompt_tokens = []
+
+    def script(llm_request):
+        prompt_tokens.append(compaction._estimate_tokens(llm_request.contents, llm_request.config.system_instruction))
+        return text_response("Grand Plaza Hotel, New York, NY, Luxury, 4.8. " * 20)
+
+    agent = Agent(name=APP_NAME, instruction="You are a travel coordinator. " * 200,
+                  model=ScriptedLlm(model="fake", script=script),
+                  before_model_callback=compaction.compact_history)
+    service = compaction.CompactingInMemorySessionService(window=window)
+    runner = Runner(agent=agent, app_name=APP_NAME, session_service=service)
+    await service.create_session(app_name=APP_NAME, user_id="bench", session_id="long")
+    for i in range(turns):
+        message = types.Content(role="user", parts=[types.Part(text=f"What about hotel {i % 5 + 1} on 2025-10-{i % 28 + 1:02d}?")])
+        async for _event in runner.run_async(user_id="bench", session_id="long", new_message=message):
+            pass
+    stats = compaction.session_stats.snapshot()["per_session"]["long"]
+    return {
+        "events_stored": stats["events_stored"],
+        "memory_bytes": stats["memory_bytes"],
+        "last_turn_prompt_tokens_est": prompt_tokens[-1],
+        "first_turn_prompt_tokens_est": prompt_tokens[0],
+    }
+
+
+async def main(args):
+    print(json.dumps({
+        "uncompacted": await run(args.turns, 0),
+        f"window_{args.window}": await run(args.turns, args.window),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--turns", type=int, default=60)
+    parser.add_argument("--window", type=int, default=30)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,244 @@
+"""In-process stand-in for the MCP Toolbox server.
+
+Serves the toolsets from mcp-toolbox/tools.yaml over the same HTTP API the
+real server exposes (GET /api/toolset/<name>, POST /api/tool/<name>/invoke),
+running each tool's statement against a SQLite copy of mcp-toolbox/db.sql.
+The Postgres dialect is translated just enough for these statements. The
+booking tools call PL/pgSQL or use data-modifying CTEs, which SQLite lacks,
+so they run as Python procedures instead (PROCEDURES).
+
+    python -m benchmarks.fake_toolbox --port 5000
+"""
+import argparse
+import asyncio
+import json
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+from collections import Counter
+from contextlib import contextmanager
+
+import yaml
+from aiohttp import web
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TOOLS_YAML = os.path.join(ROOT_DIR, "mcp-toolbox", "tools.yaml")
+DB_SQL = os.path.join(ROOT_DIR, "mcp-toolbox", "db.sql")
+
+
+def _array_literal(match: re.Match) -> str:
+    items = re.findall(r"'((?:[^']|'')*)'", match.group(1))
+    return "'" + json.dumps([item.replace("''", "'") for item in items]).replace("'", "''") + "'"
+
+
+def sqlite_schema(sql: str) -> str:
+    """Translates db.sql from Postgres to SQLite, leaving out the trigram (GIN) indexes."""
+    sql = re.sub(r"^CREATE EXTENSION .*$", "", sql, flags=re.MULTILINE)
+    sql = re.sub(r"^CREATE (?:OR REPLACE )?FUNCTION .*?\$\$ LANGUAGE plpgsql;$", "", sql, flags=re.MULTILINE | re.DOTALL)
+    sql = re.sub(r"^CREATE INDEX .* USING gin .*$", "", sql, flags=re.MULTILINE)
+    sql = re.sub(r"\bSERIAL PRIMARY KEY\b", "INTEGER PRIMARY KEY AUTOINCREMENT", sql)
+    sql = re.sub(r"\bTEXT\[\]", "TEXT", sql)
+    sql = re.sub(r"ARRAY\[(.*?)\]", _array_literal, sql)
+    return sql
+
+
+def sqlite_statement(statement: str) -> str:
+    """Translates a tools.yaml statement from Postgres to SQLite."""
+    statement = re.sub(r"\$(\d+)::date \+ INTERVAL '1 day'", r"date(:p\1, '+1 day')", statement)
+    statement = re.sub(r"\$(\d+)(?:::\w+)?", r":p\1", statement)
+    statement = re.sub(r"\bILIKE\b", "LIKE", statement, flags=re.IGNORECASE)
+    statement = re.sub(r"\bNOW\(\)", "CURRENT_TIMESTAMP", statement, flags=re.IGNORECASE)
+    return statement
+
+
+class ToolError(Exception):
+    """A tool failure reported to the caller, like a RAISE EXCEPTION in Postgres."""
+
+
+@contextmanager
+def _transaction(conn: sqlite3.Connection):
+    # BEGIN IMMEDIATE takes SQLite's write lock up front; it stands in for the row locks.
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+
+
+def book_itinerary(conn: sqlite3.Connection, customer_name: str, booking_types: list, service_ids: list,
+                   booking_dates: list, total_amounts: list) -> list[dict]:
+    """SQLite version of book_itinerary() in db.sql."""
+    count = len(booking_types or [])
+    if not count or any(len(values or []) != count for values in (service_ids, booking_dates, total_amounts)):
+        raise ToolError("An itinerary needs one booking type, service id, date and amount per item")
+    items = list(zip(booking_types, service_ids, booking_dates, total_amounts))
+    seats = Counter(service_id for booking_type, service_id, _, _ in items if booking_type == "flight")
+    cars = Counter(service_id for booking_type, service_id, _, _ in items if booking_type == "car_rental")
+
+    with _transaction(conn):
+        short = []
+        for flight_id, wanted in sorted(seats.items()):
+            row = conn.execute("SELECT available_seats FROM flights WHERE id = ?", (flight_id,)).fetchone()
+            if row is None or row[0] < wanted:
+                short.append(f"flight {flight_id}")
+        if short:
+            raise ToolError(f"Not enough seats left on {', '.join(short)}")
+        taken = []
+        for car_id, wanted in sorted(cars.items()):
+            row = conn.execute("SELECT available FROM rental_cars WHERE id = ?", (car_id,)).fetchone()
+            if row is None or not row[0] or wanted > 1:
+                taken.append(f"car {car_id}")
+        if taken:
+            raise ToolError(f"No longer available: {', '.join(taken)}")
+        unknown = [
+            f"{booking_type} {service_id}" for booking_type, service_id, _, _ in items
+            if booking_type in ("hotel", "restaurant") and conn.execute(
+                f"SELECT 1 FROM {booking_type}s WHERE id = ?", (service_id,)).fetchone() is None
+        ]
+        if unknown:
+            raise ToolError(f"Unknown {', '.join(unknown)}")
+
+        conn.executemany("UPDATE flights SET available_seats = available_seats - ? WHERE id = ?",
+                         [(wanted, flight_id) for flight_id, wanted in seats.items()])
+        conn.executemany("UPDATE rental_cars SET available = FALSE WHERE id = ?", [(car_id,) for car_id in cars])
+        values = ", ".join(["(?, ?, ?, ?, ?, 'confirmed')"] * count)
+        rows = conn.execute(
+            "INSERT INTO bookings (customer_name, booking_type, service_id, booking_date, total_amount, status)"
+            f" VALUES {values} RETURNING *",
+            [value for item in items for value in (customer_name, *item)],
+        ).fetchall()
+    return [dict(row) for row in rows]
+
+
+def cancel_booking(conn: sqlite3.Connection, booking_id: int) -> list[dict]:
+    """SQLite version of the cancel-booking statement."""
+    with _transaction(conn):
+        previous = conn.execute("SELECT status, booking_type, service_id FROM bookings WHERE id = ?",
+                                (booking_id,)).fetchone()
+        if previous is None:
+            return []
+        conn.execute("UPDATE bookings SET status = 'cancelled', updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+                     (booking_id,))
+        if previous["status"] != "cancelled" and previous["booking_type"] == "flight":
+            conn.execute("UPDATE flights SET available_seats = MIN(available_seats + 1, total_seats) WHERE id = ?",
+                         (previous["service_id"],))
+        if previous["status"] != "cancelled" and previous["booking_type"] == "car_rental":
+            conn.execute("UPDATE rental_cars SET available = TRUE WHERE id = ?", (previous["service_id"],))
+        rows = conn.execute("SELECT id, customer_name, booking_type, service_id, booking_date, total_amount, status"
+                            " FROM bookings WHERE id = ?", (booking_id,)).fetchall()
+    return [dict(row) for row in rows]
+
+
+PROCEDURES = {
+    "create-booking": lambda conn, p: book_itinerary(
+        conn, p.get("customer_name"), [p.get("booking_type")], [p.get("service_id")], [p.get("booking_date")],
+        [p.get("total_amount")]),
+    "book-itinerary": lambda conn, p: book_itinerary(
+        conn, p.get("customer_name"), p.get("booking_types"), p.get("service_ids"), p.get("booking_dates"),
+        p.get("total_amounts")),
+    "cancel-booking": lambda conn, p: cancel_booking(conn, p.get("booking_id")),
+}
+
+
+class FakeToolbox:
+    def __init__(self, tools_yaml: str = TOOLS_YAML, db_sql: str = DB_SQL, latency: float = 0.0,
+                 db_path: str = None):
+        with open(tools_yaml) as f:
+            config = yaml.safe_load(f)
+        self.tools = config["tools"]
+        self.toolsets = config["toolsets"]
+        self.latency = latency
+        self.invocations = 0
+
+        if db_path is None:
+            fd, db_path = tempfile.mkstemp(suffix=".db", prefix="fake_toolbox_")
+            os.close(fd)
+        self.db_path = db_path
+        self._local = threading.local()
+        with open(db_sql) as f:
+            schema = sqlite_schema(f.read())
+        conn = sqlite3.connect(db_path)
+        conn.executescript(schema)
+        conn.close()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    def manifest(self, toolset_name: str) -> dict:
+        return {
+            "serverVersion": "fake",
+            "tools": {
+                name: {
+                    "description": self.tools[name]["description"],
+                    "parameters": [
+                        {
+                            "name": p["name"],
+                            "type": p["type"],
+                            "description": p.get("description", ""),
+                            "required": p.get("required", True),
+                            **({"items": p["items"]} if "items" in p else {}),
+                        }
+                        for p in self.tools[name].get("parameters", [])
+                    ],
+                    "authRequired": [],
+                }
+                for name in self.toolsets[toolset_name]
+            },
+        }
+
+    def invoke_sync(self, tool_name: str, params: dict) -> list[dict]:
+        if tool_name in PROCEDURES:
+            return PROCEDURES[tool_name](self._connection(), params)
+        tool = self.tools[tool_name]
+        args = {f"p{i}": params.get(p["name"]) for i, p in enumerate(tool.get("parameters", []), start=1)}
+        conn = self._connection()
+        rows = conn.execute(sqlite_statement(tool["statement"]), args).fetchall()
+        return [dict(row) for row in rows]
+
+    async def _toolset(self, request: web.Request) -> web.Response:
+        name = request.match_info["name"]
+        if name not in self.toolsets:
+            return web.json_response({"error": f"toolset {name} not found"}, status=404)
+        return web.json_response(self.manifest(name))
+
+    async def _invoke(self, request: web.Request) -> web.Response:
+        name = request.match_info["name"]
+        if name not in self.tools:
+            return web.json_response({"error": f"tool {name} not found"}, status=404)
+        self.invocations += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        try:
+            rows = await asyncio.to_thread(self.invoke_sync, name, await request.json())
+        except (sqlite3.Error, ToolError) as e:
+            return web.json_response({"error": str(e)}, status=400)
+        return web.json_response({"result": json.dumps(rows, default=str) if rows else "null"})
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/api/toolset/{name}", self._toolset)
+        app.router.add_post("/api/tool/{name}/invoke", self._invoke)
+        return app
+
+    async def start(self, host: str = "127.0.0.1", port: int = 5000) -> web.AppRunner:
+        runner = web.AppRunner(self.app())
+        await runner.setup()
+        await web.TCPSite(runner, host, port).start()
+        return runner
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=5000)
+    parser.add_argument("--latency", type=float, default=0.0)
+    args = parser.parse_args()
+    web.run_app(FakeToolbox(latency=args.latency).app(), host="127.0.0.1", port=args.port)
@@ -0,0 +1,169 @@
+"""Local stand-ins used by the offline benchmarks."""
+import asyncio
+import inspect
+import json
+import re
+from typing import AsyncGenerator, Callable, Optional
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+
+from helpers.router import ROUTE_KEYWORDS, KeywordRouter
+
+
+def text_response(text: str) -> LlmResponse:
+    return LlmResponse(content=types.Content(role="model", parts=[types.Part.from_text(text=text)]))
+
+
+def function_call_response(calls: list[tuple[str, dict]]) -> LlmResponse:
+    return LlmResponse(content=types.Content(role="model", parts=[
+        types.Part(function_call=types.FunctionCall(name=name, args=args)) for name, args in calls
+    ]))
+
+
+def answered_tools(llm_request: LlmRequest) -> set[str]:
+    """Names of the tools whose responses are already in the request."""
+    return {
+        part.function_response.name
+        for content in llm_request.contents
+        for part in content.parts or []
+        if part.function_response
+    }
+
+
+class ScriptedLlm(BaseLlm):
+    """A model that answers with `script(llm_request)` after `latency` seconds."""
+
+    script: Callable[[LlmRequest], LlmResponse]
+    latency: float = 0.0
+    calls: int = 0
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        yield self.script(llm_request)
+
+
+# --- Scripted stand-ins for the travel agents ----------------------------------
+
+CITIES = ["New York", "Los Angeles", "Chicago", "San Francisco", "Miami"]
+CUISINES = ["Italian", "Japanese", "American", "Indian", "Seafood"]
+VEHICLE_TYPES = ["Economy", "Compact", "Mid-size", "Full-size", "SUV", "Luxury"]
+PRICE_TIERS = ["Upper Midscale", "Upper Upscale", "Midscale", "Upscale", "Luxury"]
+
+_DATE = re.compile(r"\b\d{4}-\d{2}-\d{2}\b")
+_ID = re.compile(r"\b(hotel|restaurant|flight|car|booking)\s*(?:id\s*)?#?\s*(\d+)\b", re.IGNORECASE)
+_CUSTOMER = re.compile(r"\bfor ([A-Z][a-z]+ [A-Z][a-z]+)\b")
+_AIRLINE = re.compile(r"\b([A-Z][a-z]+) Air(?:lines|ways)\b")
+_AMOUNT = re.compile(r"\$(\d+(?:\.\d+)?)")
+_QUOTED = re.compile(r'"([^"]+)"')
+
+
+def current_turn(llm_request: LlmRequest) -> tuple[str, list[types.Content]]:
+    """The latest user text and the contents that followed it."""
+    for i in range(len(llm_request.contents) - 1, -1, -1):
+        content = llm_request.contents[i]
+        if content.role == "user" and any(part.text for part in content.parts or []):
+            text = " ".join(part.text for part in content.parts if part.text)
+            return text, llm_request.contents[i + 1:]
+    return "", []
+
+
+def _turn_responses(contents: list[types.Content]) -> list[types.FunctionResponse]:
+    return [part.function_response for content in contents for part in content.parts or [] if part.function_response]
+
+
+def _first(options: list[str], text: str) -> Optional[str]:
+    lowered = text.lower()
+    hits = [(lowered.find(option.lower()), option) for option in options if option.lower() in lowered]
+    return min(hits)[1] if hits else None
+
+
+def extract_args(text: str) -> dict:
+    """Pulls tool arguments out of a request the way a model would, for the known sample data."""
+    args = {}
+    cities = sorted((text.find(city), city) for city in CITIES if city in text)
+    if cities:
+        args["location"] = args["pickup_location"] = cities[0][1]
+        args["departure_city"] = cities[0][1]
+        if len(cities) > 1:
+            args["arrival_city"] = cities[1][1]
+    dates = _DATE.findall(text)
+    if dates:
+        args["departure_date"] = args["pickup_date"] = args["booking_date"] = dates[0]
+        args["return_date"] = dates[-1]
+    for kind, value in _ID.findall(text):
+        args[f"{kind.lower()}_id"] = int(value)
+        if kind.lower() != "booking":
+            args["service_id"] = int(value)
+            args["booking_type"] = "car_rental" if kind.lower() == "car" else kind.lower()
+    for key, options in [("cuisine_type", CUISINES), ("vehicle_type", VEHICLE_TYPES), ("price_tier", PRICE_TIERS)]:
+        value = _first(options, text)
+        if value:
+            args[key] = value
+    for key, pattern in [("customer_name", _CUSTOMER), ("airline", _AIRLINE), ("name", _QUOTED)]:
+        match = pattern.search(text)
+        if match:
+            args[key] = match.group(1)
+    match = _AMOUNT.search(text)
+    if match:
+        args["total_amount"] = float(match.group(1))
+    return args
+
+
+def _pick_tool(llm_request: LlmRequest, args: dict) -> Optional[tuple[str, dict]]:
+    """The tool whose required parameters are all known, preferring the most specific one."""
+    best, best_score = None, None
+    for name, tool in llm_request.tools_dict.items():
+        params = inspect.signature(tool.func).parameters.values()
+        required = [p.name for p in params if p.default is inspect.Parameter.empty]
+        if not all(p in args for p in required):
+            continue
+        call_args = {p.name: args[p.name] for p in params if p.name in args}
+        score = (len(required), len(call_args))
+        if best_score is None or score > best_score:
+            best, best_score = (name, call_args), score
+    return best
+
+
+def specialist_script(llm_request: LlmRequest) -> LlmResponse:
+    """Calls the best-fitting tool once, then summarizes what it returned."""
+    text, turn = current_turn(llm_request)
+    responses = _turn_responses(turn)
+    if responses:
+        return text_response(" ".join(f"{r.name}: {json.dumps(r.response, default=str)[:300]}" for r in responses))
+    call = _pick_tool(llm_request, extract_args(text))
+    if call is None:
+        return text_response("Could you tell me the city, dates or IDs you are interested in?")
+    return function_call_response([call])
+
+
+def coordinator_script() -> Callable[[LlmRequest], LlmResponse]:
+    """Delegates to every specialist whose domain the request mentions, all in one step."""
+    router = KeywordRouter()
+    domains = {
+        name: re.compile(r"\b(" + "|".join(re.escape(k) for k in keywords) + r")\b")
+        for name, keywords in ROUTE_KEYWORDS.items()
+    }
+
+    def script(llm_request: LlmRequest) -> LlmResponse:
+        text, turn = current_turn(llm_request)
+        responses = _turn_responses(turn)
+        if responses:
+            return text_response("\n".join(f"{r.name}: {(r.response or {}).get('result', '')}" for r in responses))
+        route = router.classify(text)
+        if route:
+            routes = [route]
+        else:
+            lowered = text.lower()
+            routes = [name for name, pattern in domains.items() if pattern.search(lowered)]
+        routes = [name for name in routes if name in llm_request.tools_dict]
+        if not routes:
+            return text_response("Are you looking for hotels, flights, restaurants, car rentals or bookings?")
+        return function_call_response([(name, {"request": text}) for name in routes])
+
+    return script
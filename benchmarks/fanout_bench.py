@@ -0,0 +1,78 @@
+"""Latency of a multi-service coordinator turn with sequential vs parallel specialist calls.
+
+    python -m benchmarks.fanout_bench [--requests 20] [--model-latency 0.2]
+
+Runs a coordinator with three BoundedAgentTool specialists through a real
+Runner, with ScriptedLlm models standing in for Gemini:
+
+- sequential: one tool call per coordinator turn (the previous behaviour)
+- parallel_cap1: all calls in one turn, AGENT_FANOUT_LIMIT=1
+- parallel: all calls in one turn, per-request cap of 3
+"""
+import argparse
+import asyncio
+import json
+
+from google.adk.agents import Agent
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from benchmarks.common import Timer, summarize
+from benchmarks.fakes import ScriptedLlm, answered_tools, function_call_response, text_response
+from helpers.fanout import BoundedAgentTool, FanoutLimiter
+
+SPECIALISTS = ["hotels_agent", "flights_agent", "restaurants_agent"]
+
+
+def build_runner(parallel: bool, per_request: int, model_latency: float) -> Runner:
+    limiter = FanoutLimiter(per_request=per_request)
+
+    def coordinator_script(llm_request):
+        pending = [name for name in SPECIALISTS if name not in answered_tools(llm_request)]
+        if not pending:
+            return text_response("Here is your complete San Francisco plan.")
+        calls = pending if parallel else pending[:1]
+        return function_call_response([(name, {"request": "San Francisco"}) for name in calls])
+
+    specialists = [
+        Agent(name=name, description=name,
+              model=ScriptedLlm(model="fake", latency=model_latency,
+                                script=lambda _req, name=name: text_response(f"{name} results")))
+        for name in SPECIALISTS
+    ]
+    coordinator = Agent(
+        name="travel_coordinator_agent",
+        model=ScriptedLlm(model="fake", latency=model_latency, script=coordinator_script),
+        tools=[BoundedAgentTool(agent, limiter=limiter) for agent in specialists],
+    )
+    return Runner(agent=coordinator, app_name="travel_coordinator_agent", session_service=InMemorySessionService())
+
+
+async def run_mode(runner: Runner, requests: int) -> dict:
+    latencies = []
+    for i in range(requests):
+        session = await runner.session_service.create_session(app_name=runner.app_name, user_id="bench")
+        content = types.Content(role="user", parts=[types.Part(text="Complete trip to San Francisco - hotel, flight, and restaurant")])
+        with Timer() as t:
+            async for _event in runner.run_async(user_id="bench", session_id=session.id, new_message=content):
+                pass
+        latencies.append(t.elapsed)
+    return summarize(latencies)
+
+
+async def main(args):
+    results = {
+        "sequential": await run_mode(build_runner(False, 3, args.model_latency), args.requests),
+        "parallel_cap1": await run_mode(build_runner(True, 1, args.model_latency), args.requests),
+        "parallel": await run_mode(build_runner(True, 3, args.model_latency), args.requests),
+    }
+    results["p50_reduction"] = 1 - results["parallel"]["p50_ms"] / results["sequential"]["p50_ms"]
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=10)
+    parser.add_argument("--model-latency", type=float, default=0.2)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,179 @@
+"""Scales the mcp-toolbox/db.sql catalog up to millions of rows.
+
+    python -m benchmarks.generate_data --rows 1000000 --sql catalog.sql
+    psql -d toolbox_db -f mcp-toolbox/db.sql && psql -d toolbox_db -f catalog.sql
+
+    python -m benchmarks.generate_data --rows 1000000 --sqlite catalog.db
+
+--rows sets the size of the two large tables, flights and bookings. Hotels,
+restaurants and rental cars get a tenth of that each, with amenities and
+menu items attached. Generated rows use ids from ID_OFFSET up, so they load
+next to the db.sql samples, and they reuse the sample cities, airlines and
+cuisines so the agents' usual queries still match. Output is deterministic
+for a given --seed.
+"""
+import argparse
+import datetime
+import itertools
+import json
+import random
+import sqlite3
+import sys
+
+from benchmarks.fake_toolbox import DB_SQL, sqlite_schema
+
+ID_OFFSET = 1000
+
+SAMPLE_CITIES = ["New York", "Los Angeles", "Chicago", "San Francisco", "Miami"]
+STATES = ["NY", "CA", "IL", "FL", "TX", "WA", "MA", "CO", "GA", "AZ", "OR", "NV"]
+CITY_PARTS = (["Port", "Lake", "Fort", "New", "East", "West", "North", "South", "Mount", "Glen"],
+              ["Alder", "Brook", "Cedar", "Dale", "Elm", "Fair", "Grove", "Haven", "Isle", "Juniper",
+               "Kings", "Laurel", "Maple", "Oak", "Pine", "Ridge", "Stone", "Willow"])
+AIRLINES = ["American Airlines", "United Airlines", "Delta Airlines", "Southwest Airlines", "JetBlue Airways",
+            "Alaska Airlines", "Frontier Airlines", "Spirit Airlines", "Hawaiian Airlines", "Sun Country Airlines"]
+AIRCRAFT = ["Boeing 737", "Boeing 757", "Airbus A320", "Airbus A321", "Embraer E175"]
+CUISINES = ["Italian", "Japanese", "American", "Indian", "Seafood", "Mexican", "Thai", "French", "Chinese",
+            "Greek", "Korean", "Vietnamese", "Spanish", "Lebanese", "Ethiopian"]
+PRICE_TIERS = ["Midscale", "Upper Midscale", "Upscale", "Upper Upscale", "Luxury"]
+HOTEL_WORDS = (["Grand", "Comfort", "Harbor", "Royal", "Park", "Summit", "Riverside", "Central", "Garden", "Coastal"],
+               ["Plaza", "Inn", "Suites", "Lodge", "Resort", "Hotel", "House", "Residences"])
+RESTAURANT_WORDS = (["The", "Little", "Golden", "Blue", "Red", "Olive", "Salt", "Smoke", "Copper", "Urban"],
+                    ["Kitchen", "Table", "Grill", "Bistro", "Corner", "Garden", "House", "Tavern", "Cantina"])
+MENU_CATEGORIES = ["Appetizer", "Main Course", "Side", "Dessert", "Drink"]
+VEHICLES = {"Economy": ("Toyota", "Corolla"), "Compact": ("Honda", "Civic"), "Mid-size": ("Nissan", "Altima"),
+            "Full-size": ("Chevrolet", "Malibu"), "SUV": ("Ford", "Explorer"), "Luxury": ("BMW", "3 Series")}
+CAR_FEATURES = ["Air Conditioning", "Bluetooth", "Backup Camera", "Navigation", "Heated Seats", "Sunroof", "4WD"]
+FIRST_NAMES = ["John", "Jane", "Mike", "Sarah", "David", "Emma", "Liam", "Olivia", "Noah", "Ava", "Lucas", "Mia",
+               "Ethan", "Zoe", "Omar", "Priya", "Wei", "Sofia", "Mateo", "Aisha"]
+LAST_NAMES = ["Smith", "Doe", "Johnson", "Wilson", "Brown", "Garcia", "Martinez", "Lee", "Patel", "Nguyen",
+              "Kim", "Clark", "Lewis", "Walker", "Young", "Allen", "King", "Wright", "Scott", "Green"]
+START_DATE = datetime.date(2025, 10, 1)
+
+
+def cities(rng: random.Random, count: int = 200) -> list[str]:
+    generated = {f"{rng.choice(CITY_PARTS[0])} {rng.choice(CITY_PARTS[1])}" for _ in range(count * 3)}
+    return SAMPLE_CITIES + sorted(generated)[:count]
+
+
+def generate(rows: int, seed: int = 42):
+    """Yields (table, columns, row iterator) in foreign-key order."""
+    rng = random.Random(seed)
+    city_names = cities(rng)
+    located = [f"{city}, {rng.choice(STATES)}" for city in city_names]
+    small = max(1, rows // 10)
+
+    def hotels():
+        for i in range(small):
+            yield (ID_OFFSET + i, f"{rng.choice(HOTEL_WORDS[0])} {rng.choice(HOTEL_WORDS[1])} {i}",
+                   rng.choice(located), rng.choice(PRICE_TIERS), round(rng.uniform(2.5, 5), 1),
+                   "Generated hotel")
+
+    def hotel_amenities():
+        for i in range(small):
+            for amenity_id in rng.sample(range(1, 11), 3):
+                yield ID_OFFSET + i, amenity_id
+
+    def flights():
+        for i in range(rows):
+            departure, arrival = rng.sample(city_names, 2)
+            airline = rng.choice(AIRLINES)
+            departs = datetime.datetime.combine(START_DATE, datetime.time()) + datetime.timedelta(
+                days=rng.randrange(365), minutes=rng.randrange(0, 24 * 60, 5))
+            arrives = departs + datetime.timedelta(minutes=rng.randrange(60, 600, 5))
+            total = rng.choice([140, 150, 160, 180, 200])
+            yield (ID_OFFSET + i, f"{airline[:2].upper()}{rng.randrange(100, 9999)}", airline, departure, arrival,
+                   departs.isoformat(sep=" "), arrives.isoformat(sep=" "), round(rng.uniform(79, 899), 2),
+                   rng.randrange(0, total), total, rng.choice(AIRCRAFT))
+
+    def restaurants():
+        for i in range(small):
+            yield (ID_OFFSET + i, f"{rng.choice(RESTAURANT_WORDS[0])} {rng.choice(RESTAURANT_WORDS[1])} {i}",
+                   rng.choice(located), rng.choice(CUISINES), round(rng.uniform(2.5, 5), 1),
+                   rng.choice(["$", "$$", "$$$", "$$$$"]), f"555-{rng.randrange(1000, 9999)}", "Generated restaurant")
+
+    def menu_items():
+        for i in range(small):
+            for n in range(5):
+                yield (ID_OFFSET + i, f"Dish {n + 1}", "Generated dish", round(rng.uniform(4, 60), 2),
+                       rng.choice(MENU_CATEGORIES), rng.random() < 0.3, rng.random() < 0.1)
+
+    def rental_cars():
+        for i in range(small):
+            vehicle_type = rng.choice(list(VEHICLES))
+            make, model = VEHICLES[vehicle_type]
+            yield (ID_OFFSET + i, vehicle_type, make, model, rng.choice([2022, 2023, 2024]),
+                   f"{rng.choice(city_names)} {rng.choice(['Airport', 'Downtown', 'Station'])}",
+                   round(rng.uniform(25, 150), 2), rng.random() < 0.8, rng.sample(CAR_FEATURES, 3))
+
+    def bookings():
+        for i in range(rows):
+            booking_type = rng.choice(["hotel", "flight", "restaurant", "car_rental"])
+            yield (ID_OFFSET + i, f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {rng.randrange(rows // 4 or 1)}",
+                   booking_type, ID_OFFSET + rng.randrange(rows if booking_type == "flight" else small),
+                   (START_DATE + datetime.timedelta(days=rng.randrange(365))).isoformat(),
+                   round(rng.uniform(20, 2000), 2), rng.choice(["confirmed"] * 8 + ["cancelled", "pending"]))
+
+    yield "hotels", ("id", "name", "location", "price_tier", "rating", "description"), hotels()
+    yield "hotel_amenities", ("hotel_id", "amenity_id"), hotel_amenities()
+    yield "flights", ("id", "flight_number", "airline", "departure_city", "arrival_city", "departure_time",
+                      "arrival_time", "price", "available_seats", "total_seats", "aircraft_type"), flights()
+    yield "restaurants", ("id", "name", "location", "cuisine_type", "rating", "price_range", "phone",
+                          "description"), restaurants()
+    yield "menu_items", ("restaurant_id", "item_name", "description", "price", "category", "is_vegetarian",
+                         "is_vegan"), menu_items()
+    yield "rental_cars", ("id", "vehicle_type", "make", "model", "year", "pickup_location", "daily_rate",
+                          "available", "features"), rental_cars()
+    yield "bookings", ("id", "customer_name", "booking_type", "service_id", "booking_date", "total_amount",
+                       "status"), bookings()
+
+
+def _copy_value(value) -> str:
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, list):
+        return "{" + ",".join('"' + item + '"' for item in value) + "}"
+    return str(value).replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n")
+
+
+def write_postgres(out, rows: int, seed: int):
+    """Writes psql COPY blocks, to be run after db.sql."""
+    for table, columns, values in generate(rows, seed):
+        out.write(f"COPY {table} ({', '.join(columns)}) FROM stdin;\n")
+        for row in values:
+            out.write("\t".join(_copy_value(value) for value in row) + "\n")
+        out.write("\\.\n")
+        if columns[0] == "id":
+            out.write(f"SELECT setval('{table}_id_seq', (SELECT max(id) FROM {table}));\n")
+    out.write("ANALYZE;\n")
+
+
+def load_sqlite(path: str, rows: int, seed: int):
+    """Creates a SQLite copy of db.sql at `path` and loads the generated rows into it."""
+    conn = sqlite3.connect(path)
+    with open(DB_SQL) as f:
+        conn.executescript(sqlite_schema(f.read()))
+    for table, columns, values in generate(rows, seed):
+        insert = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+        values = (tuple(json.dumps(v) if isinstance(v, list) else v for v in row) for row in values)
+        while batch := list(itertools.islice(values, 50_000)):
+            conn.executemany(insert, batch)
+        conn.commit()
+    conn.execute("ANALYZE")
+    conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000, help="flights and bookings rows")
+    parser.add_argument("--seed", type=int, default=42)
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--sql", help="write psql COPY statements to this file ('-' for stdout)")
+    target.add_argument("--sqlite", help="create a SQLite database at this path")
+    args = parser.parse_args()
+    if args.sqlite:
+        load_sqlite(args.sqlite, args.rows, args.seed)
+    elif args.sql == "-":
+        write_postgres(sys.stdout, args.rows, args.seed)
+    else:
+        with open(args.sql, "w") as out:
+            write_postgres(out, args.rows, args.seed)
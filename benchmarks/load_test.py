@@ -0,0 +1,170 @@
+"""Offline load test of the /query pipeline.
+
+    python -m benchmarks.load_test [--users 20] [--requests 200] [--model-latency 0.3]
+
+Drives the real FastAPI app, Runner and agent tree in-process (httpx over
+ASGI) with local stand-ins for everything remote:
+
+- Gemini: ScriptedLlm models that pick tools from the request text
+- MCP Toolbox: FakeToolbox serving tools.yaml over a SQLite copy of db.sql
+- Firebase: AUTH_BACKEND=fake
+
+Each virtual user runs multi-turn sessions back to back (a closed loop, so
+--users is the concurrency). Reports req/s, latency percentiles, event-loop
+lag and memory per session. Other settings (SESSION_BACKEND, FAST_ROUTER,
+TOOL_CACHE_TTL, RESPONSE_CACHE_TTL, MODEL_RATE_LIMIT, ...) are read from the environment
+as usual.
+"""
+import argparse
+import asyncio
+import contextlib
+import gc
+import json
+import os
+import resource
+import time
+
+import httpx
+
+from benchmarks.common import LoopLagMonitor, Timer, summarize
+from benchmarks.fake_toolbox import FakeToolbox
+from benchmarks.fakes import ScriptedLlm, coordinator_script, specialist_script
+
+# One list per session; each virtual user cycles through them.
+SESSIONS = [
+    ["Find hotels in Miami", "What amenities does hotel 5 have?",
+     "Book hotel 5 for John Smith on 2025-10-19 for $899"],
+    ["Flights from Chicago to San Francisco on 2025-10-16", "Any United Airlines flights from Chicago?",
+     "Show bookings for Jane Doe"],
+    ["Plan a trip to New York with a hotel, flights from Miami and Italian restaurants",
+     "What's on the menu at restaurant 1?"],
+    ["Rent an SUV in San Francisco", "Car rental in Los Angeles from 2025-10-15 to 2025-10-18"],
+    ["Japanese restaurants in Los Angeles", "Luxury hotels in Miami"],
+]
+
+
+def rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def install_fake_models(main, model_latency: float) -> list[ScriptedLlm]:
+    models = [ScriptedLlm(model="fake-coordinator", latency=model_latency, script=coordinator_script())]
+    main.root_agent.model = models[0]
+    for agent in main.specialist_runners.values():
+        model = ScriptedLlm(model=f"fake-{agent.agent.name}", latency=model_latency, script=specialist_script)
+        agent.agent.model = model
+        models.append(model)
+    return models
+
+
+async def virtual_user(client: httpx.AsyncClient, user: int, budget: dict, results: dict, think_time: float):
+    phone_number = f"+1555{user:07d}"
+    turns = 0
+    while True:
+        script = SESSIONS[(user + turns) % len(SESSIONS)]
+        session_id = None
+        for query in script:
+            if budget["remaining"] <= 0 or time.perf_counter() >= budget["deadline"]:
+                return
+            budget["remaining"] -= 1
+            turns += 1
+            payload = {"query": query, "phone_number": phone_number}
+            if session_id:
+                payload["session_id"] = session_id
+            with Timer() as t:
+                try:
+                    response = await client.post("/query", json=payload)
+                except Exception as e:
+                    results["errors"].append(f"{type(e).__name__}: {e}")
+                    break
+            if response.status_code != 200:
+                results["errors"].append(f"HTTP {response.status_code}: {response.text[:200]}")
+                break
+            results["latencies"].append(t.elapsed)
+            if session_id is None:
+                session_id = response.json()["session_id"]
+                results["sessions"] += 1
+            if think_time:
+                await asyncio.sleep(think_time)
+
+
+async def main(args):
+    toolbox = FakeToolbox(latency=args.toolbox_latency)
+    toolbox_runner = await toolbox.start(port=0)
+    port = toolbox_runner.addresses[0][1]
+
+    os.environ["TOOLBOX_URL"] = f"http://127.0.0.1:{port}"
+    os.environ["TOOLBOX_MANIFEST_CACHE_DIR"] = ""
+    os.environ["AUTH_BACKEND"] = "fake"
+    os.environ.setdefault("GOOGLE_API_KEY", "offline")
+    import main as app_module
+
+    models = install_fake_models(app_module, args.model_latency)
+    results = {"latencies": [], "errors": [], "sessions": 0}
+    budget = {"remaining": args.requests, "deadline": time.perf_counter() + args.duration}
+
+    output = contextlib.nullcontext()
+    if not args.verbose:
+        output = contextlib.redirect_stdout(open(os.devnull, "w"))
+    transport = httpx.ASGITransport(app=app_module.app)
+    try:
+        with output:
+            async with app_module.lifespan(app_module.app), \
+                    httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=None) as client:
+                gc.collect()
+                rss_before = rss_bytes()
+                with LoopLagMonitor() as lag, Timer() as wall:
+                    await asyncio.gather(*(
+                        virtual_user(client, user, budget, results, args.think_time) for user in range(args.users)
+                    ))
+                gc.collect()
+                rss_after = rss_bytes()
+                session_totals = (await client.get("/sessions/stats")).json()["totals"]
+                tool_cache_stats = (await client.get("/tools/cache/stats")).json()
+                response_cache_stats = (await client.get("/responses/cache/stats")).json()
+                router_stats = (await client.get("/router/stats")).json()
+                admission_stats = (await client.get("/admission/stats")).json()
+    finally:
+        await toolbox_runner.cleanup()
+
+    completed = len(results["latencies"])
+    sessions = max(1, results["sessions"])
+    report = {
+        "users": args.users,
+        "requests": completed,
+        "errors": len(results["errors"]),
+        "sample_errors": results["errors"][:5],
+        "wall_s": wall.elapsed,
+        "req_per_s": completed / wall.elapsed if wall.elapsed else 0.0,
+        "latency": summarize(results["latencies"]),
+        "loop_lag": summarize(lag.samples),
+        "memory": {
+            "sessions": results["sessions"],
+            "rss_delta_bytes": rss_after - rss_before,
+            "rss_per_session_bytes": (rss_after - rss_before) / sessions,
+            "stored_bytes_per_session": session_totals.get("memory_bytes", 0) / sessions,
+        },
+        "model_calls": sum(model.calls for model in models),
+        "toolbox_invocations": toolbox.invocations,
+        "tool_cache": tool_cache_stats,
+        "response_cache": response_cache_stats,
+        "routes": {route: stats["count"] for route, stats in router_stats["routes"].items()},
+        "admission": admission_stats,
+    }
+    print(json.dumps(report, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=20, help="concurrent virtual users")
+    parser.add_argument("--requests", type=int, default=200, help="total /query requests to send")
+    parser.add_argument("--duration", type=float, default=300, help="stop sending after this many seconds")
+    parser.add_argument("--model-latency", type=float, default=0.3, help="seconds per fake model call")
+    parser.add_argument("--toolbox-latency", type=float, default=0.01, help="seconds per fake tool call")
+    parser.add_argument("--think-time", type=float, default=0.0, help="pause between a user's turns")
+    parser.add_argument("--verbose", action="store_true", help="keep the app's progress prints")
+    asyncio.run(main(parser.parse_args()))
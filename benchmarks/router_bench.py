@@ -0,0 +1,84 @@
+"""Offline accuracy and latency benchmark for the /query fast-path router.
+
+    python -m benchmarks.router_bench [--router keyword] [--repeat 200]
+
+Each labelled query expects either a specialist agent name or None (the
+coordinator must handle it). "precision" is the share of fast-path decisions
+that were right; a wrong fast-path answer is worse than a missed one.
+"""
+import argparse
+import json
+import time
+
+from benchmarks.common import summarize
+from helpers.router import create_router
+
+LABELLED_QUERIES = [
+    ("Find luxury hotels in New York with pools", "hotels_agent"),
+    ("Show me hotels in Chicago", "hotels_agent"),
+    ("What amenities does hotel 3 have?", "hotels_agent"),
+    ("Any upscale resorts in Miami?", "hotels_agent"),
+    ("I need a room in San Francisco", "hotels_agent"),
+    ("Flights from Chicago to San Francisco on 2025-10-16", "flights_agent"),
+    ("Show me American Airlines flights", "flights_agent"),
+    ("Which flights still have at least 50 seats?", "flights_agent"),
+    ("I want to fly from New York to Los Angeles", "flights_agent"),
+    ("Italian restaurants in New York", "restaurants_agent"),
+    ("What's on the menu at restaurant ID 5?", "restaurants_agent"),
+    ("Where can I eat seafood in Miami?", "restaurants_agent"),
+    ("Best rated dining options in Chicago", "restaurants_agent"),
+    ("Rent a car in Miami", "car_rental_agent"),
+    ("Available SUVs in San Francisco", "car_rental_agent"),
+    ("Car rental at airport", "car_rental_agent"),
+    ("I need an economy vehicle in Chicago", "car_rental_agent"),
+    ("Cancel booking ID 12345", "booking_management_agent"),
+    ("Show my bookings for John Smith", "booking_management_agent"),
+    ("What reservations does Jane Doe have?", "booking_management_agent"),
+    ("Book a flight from Chicago to Miami on December 15th", None),
+    ("I need a complete trip to San Francisco - hotel, flight, and restaurant recommendations", None),
+    ("Plan a trip to Paris with hotel and flights", None),
+    ("Book this hotel for me", None),
+    ("Hotels and restaurants near Times Square", None),
+    ("What about the second one?", None),
+    ("Thanks!", None),
+    ("Is there a car at the airport near my hotel?", None),
+]
+
+
+def main(args):
+    router = create_router(args.router)
+    correct = routed = routed_correct = 0
+    mistakes = []
+    for query, expected in LABELLED_QUERIES:
+        route = router.route(query)
+        correct += route == expected
+        if route is not None:
+            routed += 1
+            routed_correct += route == expected
+        if route != expected:
+            mistakes.append({"query": query, "expected": expected, "got": route})
+
+    latencies = []
+    if router.router is not None:
+        for _ in range(args.repeat):
+            for query, _expected in LABELLED_QUERIES:
+                start = time.perf_counter()
+                router.router.classify(query)
+                latencies.append(time.perf_counter() - start)
+
+    print(json.dumps({
+        "queries": len(LABELLED_QUERIES),
+        "accuracy": correct / len(LABELLED_QUERIES),
+        "fast_path_coverage": routed / len(LABELLED_QUERIES),
+        "precision": routed_correct / routed if routed else 0.0,
+        "classify_latency": summarize(latencies),
+        "mistakes": mistakes,
+        "route_hit_rates": router.stats.snapshot(),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--router", default="keyword")
+    parser.add_argument("--repeat", type=int, default=200)
+    main(parser.parse_args())
@@ -0,0 +1,83 @@
+"""Session service throughput: in-memory vs SQLite (batched and unbatched appends).
+
+    python -m benchmarks.session_bench [--sessions 200] [--events 20] [--db /tmp/bench_sessions.db]
+
+Creates sessions concurrently, then appends events to all of them at once the
+way concurrent /query turns do, and reports sessions/sec, appends/sec and
+append latency percentiles.
+"""
+import argparse
+import asyncio
+import json
+import os
+
+from google.adk.events.event import Event
+from google.adk.events.event_actions import EventActions
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from benchmarks.common import Timer, summarize
+from helpers.sqlite_session_service import SqliteSessionService
+
+APP_NAME = "travel_coordinator_agent"
+
+
+async def run(service, sessions: int, events: int) -> dict:
+    with Timer() as create:
+        created = await asyncio.gather(*(
+            service.create_session(app_name=APP_NAME, user_id=f"user_{i % 50}", session_id=f"s{i}")
+            for i in range(sessions)
+        ))
+
+    latencies = []
+
+    async def turn(session, i):
+        event = Event(
+            author="travel_coordinator_agent",
+            invocation_id=f"inv_{i}",
+            content=types.Content(role="model", parts=[types.Part(text="Here are the hotels in New York: " * 5)]),
+            actions=EventActions(state_delta={"last_turn": i}),
+        )
+        with Timer() as t:
+            await service.append_event(session, event)
+        latencies.append(t.elapsed)
+
+    async def conversation(session):
+        for i in range(events):
+            await turn(session, i)
+
+    with Timer() as append:
+        await asyncio.gather(*(conversation(session) for session in created))
+
+    check = await service.get_session(app_name=APP_NAME, user_id=created[0].user_id, session_id=created[0].id)
+    assert len(check.events) == events and check.state["last_turn"] == events - 1
+    return {
+        "sessions_per_s": sessions / create.elapsed,
+        "appends_per_s": sessions * events / append.elapsed,
+        "append_latency": summarize(latencies),
+    }
+
+
+def fresh_sqlite(path: str, max_batch: int) -> SqliteSessionService:
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    return SqliteSessionService(path, max_batch=max_batch)
+
+
+async def main(args):
+    results = {"memory": await run(InMemorySessionService(), args.sessions, args.events)}
+    for name, max_batch in [("sqlite_batched", 256), ("sqlite_unbatched", 1)]:
+        service = fresh_sqlite(args.db, max_batch)
+        results[name] = await run(service, args.sessions, args.events)
+        results[name]["avg_batch_size"] = service.batched_writes / max(service.batches, 1)
+        await service.close()
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--events", type=int, default=20)
+    parser.add_argument("--db", default="/tmp/bench_sessions.db")
+    asyncio.run(main(parser.parse_args()))
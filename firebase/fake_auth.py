@@ -0,0 +1,30 @@
+import asyncio
+import hashlib
+import time
+
+
+class FakeAuthBackend:
+    """Offline stand-in for FirebaseAuthBackend (select with AUTH_BACKEND=fake).
+
+    Every phone number maps to a stable uid. `latency` simulates the Firebase
+    round trips; with `blocking=True` the wait happens on the event loop, the way
+    the old synchronous authenticateUser behaved.
+    """
+
+    def __init__(self, latency: float = 0.05, token_lifetime: float = 3600, blocking: bool = False):
+        self.latency = latency
+        self.token_lifetime = token_lifetime
+        self.blocking = blocking
+        self.calls = 0
+
+    async def sign_in(self, phone_number: str) -> tuple[str, str, float]:
+        self.calls += 1
+        if self.blocking:
+            time.sleep(self.latency)
+        else:
+            await asyncio.sleep(self.latency)
+        uid = "fake_" + hashlib.sha1(str(phone_number).encode()).hexdigest()[:20]
+        return uid, f"fake-id-token-{uid}-{self.calls}", time.time() + self.token_lifetime
+
+    async def close(self):
+        pass
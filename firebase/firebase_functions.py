@@ -1,8 +1,9 @@
-import firebase_admin
-from firebase_admin import credentials,  auth
+import asyncio
 import os
-import requests
+import time
 
+import httpx
+from cachetools import TLRUCache
 from dotenv import load_dotenv
 load_dotenv()
 
@@ -10,31 +11,150 @@ load_dotenv()
 current_dir = os.path.dirname(__file__)
 key_path = os.path.join(current_dir, "serviceAccountKey.json")
 
-cred = credentials.Certificate(key_path)
-firebase_admin.initialize_app(cred)
-
-api_key=os.getenv("FIREBASE_WEB_API_KEY")
+api_key = os.getenv("FIREBASE_WEB_API_KEY")
 
 # print('api_key', api_key)
 url = f"https://identitytoolkit.googleapis.com/v1/accounts:signInWithCustomToken?key={api_key}"
 
-async def authenticateUser(phone_number):
-    try:
-        user = auth.get_user_by_phone_number(phone_number)
-        custom_token = auth.create_custom_token(user.uid)
-        response = requests.post(url, {
-			"token": custom_token,
-			"returnSecureToken": True
-		})
-        response.raise_for_status() # Raise an exception for HTTP errors
+AUTH_BACKEND = os.getenv("AUTH_BACKEND", "firebase")
+AUTH_CACHE_SIZE = int(os.getenv("AUTH_CACHE_SIZE", "10000"))
+AUTH_CACHE_TTL = float(os.getenv("AUTH_CACHE_TTL", "900"))
+# Refresh this many seconds before the ID token actually expires.
+AUTH_TOKEN_EXPIRY_SKEW = float(os.getenv("AUTH_TOKEN_EXPIRY_SKEW", "60"))
+AUTH_HTTP_POOL_SIZE = int(os.getenv("AUTH_HTTP_POOL_SIZE", "20"))
+AUTH_HTTP_TIMEOUT = float(os.getenv("AUTH_HTTP_TIMEOUT", "10"))
+
+
+class FirebaseAuthBackend:
+    """Signs a phone number in against Firebase without blocking the event loop.
+
+    firebase-admin only has a synchronous API, so its calls run in worker threads;
+    the Identity Toolkit exchange goes through a pooled httpx.AsyncClient.
+    """
+
+    def __init__(self):
+        import firebase_admin
+        from firebase_admin import credentials, auth
+
+        if not firebase_admin._apps:
+            firebase_admin.initialize_app(credentials.Certificate(key_path))
+        self._auth = auth
+        self._http = None
+
+    def _client(self) -> httpx.AsyncClient:
+        if self._http is None:
+            self._http = httpx.AsyncClient(
+                timeout=AUTH_HTTP_TIMEOUT,
+                limits=httpx.Limits(max_connections=AUTH_HTTP_POOL_SIZE,
+                                    max_keepalive_connections=AUTH_HTTP_POOL_SIZE),
+            )
+        return self._http
+
+    async def sign_in(self, phone_number: str) -> tuple[str, str, float]:
+        user = await asyncio.to_thread(self._auth.get_user_by_phone_number, phone_number)
+        custom_token = await asyncio.to_thread(self._auth.create_custom_token, user.uid)
+        if isinstance(custom_token, bytes):
+            custom_token = custom_token.decode()
+
+        response = await self._client().post(url, json={
+            "token": custom_token,
+            "returnSecureToken": True
+        })
+        response.raise_for_status()  # Raise an exception for HTTP errors
         sign_in_data = response.json()
         id_token = sign_in_data['idToken']
-        
-        decoded_token = auth.verify_id_token(id_token)
-        uid = decoded_token['uid']
-        
+
+        decoded_token = await asyncio.to_thread(self._auth.verify_id_token, id_token)
+        return decoded_token['uid'], id_token, float(decoded_token['exp'])
+
+    async def close(self):
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+
+def _create_backend():
+    if AUTH_BACKEND == "fake":
+        from firebase.fake_auth import FakeAuthBackend
+        return FakeAuthBackend()
+    return FirebaseAuthBackend()
+
+
+class AuthCache:
+    """Bounded phone number -> (uid, id_token) cache that never outlives the ID token.
+
+    Concurrent misses for the same phone number share a single sign-in.
+    """
+
+    def __init__(self, backend, maxsize: int = AUTH_CACHE_SIZE, ttl: float = AUTH_CACHE_TTL,
+                 expiry_skew: float = AUTH_TOKEN_EXPIRY_SKEW):
+        self.backend = backend
+        self.ttl = ttl
+        self.expiry_skew = expiry_skew
+        self._cache = TLRUCache(maxsize=maxsize, ttu=self._expires_at, timer=time.time)
+        self._inflight: dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        # Lookups that joined another caller's in-flight sign-in.
+        self.coalesced = 0
+
+    def _expires_at(self, _key, value, now):
+        _uid, _id_token, token_exp = value
+        return min(now + self.ttl, token_exp - self.expiry_skew)
+
+    async def get(self, phone_number: str) -> tuple[str, str]:
+        cached = self._cache.get(phone_number)
+        if cached is not None:
+            self.hits += 1
+            return cached[0], cached[1]
+
+        future = self._inflight.get(phone_number)
+        if future is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            future = asyncio.ensure_future(self.backend.sign_in(phone_number))
+            self._inflight[phone_number] = future
+            future.add_done_callback(lambda _f: self._inflight.pop(phone_number, None))
+        uid, id_token, token_exp = await asyncio.shield(future)
+        if token_exp - self.expiry_skew > time.time():
+            self._cache[phone_number] = (uid, id_token, token_exp)
+        return uid, id_token
+
+    def invalidate(self, phone_number: str):
+        self._cache.pop(phone_number, None)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_rate": (self.hits + self.coalesced) / lookups if lookups else 0.0,
+            "size": len(self._cache),
+        }
+
+
+_auth_cache = None
+
+
+def get_auth_cache() -> AuthCache:
+    global _auth_cache
+    if _auth_cache is None:
+        _auth_cache = AuthCache(_create_backend())
+    return _auth_cache
+
+
+async def close_auth():
+    if _auth_cache is not None and hasattr(_auth_cache.backend, "close"):
+        await _auth_cache.backend.close()
+
+
+async def authenticateUser(phone_number):
+    try:
+        uid, _id_token = await get_auth_cache().get(phone_number)
         return uid
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         print(f"Error signing in with custom token: {e}")
-        if hasattr(e, 'response') and e.response is not None:
-            print(f"Error details: {e.response.json()}")
\ No newline at end of file
+        if isinstance(e, httpx.HTTPStatusError):
+            print(f"Error details: {e.response.text}")
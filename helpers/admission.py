@@ -0,0 +1,221 @@
+# helpers/admission.py
+
+import asyncio
+import math
+import os
+import time
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import Hashable, Optional
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+
+from helpers.metrics import Counter, Gauge, Histogram, registry
+
+# Agent runs in progress at once in this process; later requests queue.
+ADMISSION_MAX_CONCURRENT = int(os.getenv("ADMISSION_MAX_CONCURRENT", "64"))
+# Requests allowed to wait for a slot; beyond this they are turned away with 503.
+ADMISSION_QUEUE_SIZE = int(os.getenv("ADMISSION_QUEUE_SIZE", "256"))
+# Seconds a request may spend waiting (for a slot or for model-call tokens) before it is shed.
+ADMISSION_DEADLINE = float(os.getenv("ADMISSION_DEADLINE", "30"))
+# Concurrent runs per user, and how many more of theirs may wait before 429.
+ADMISSION_PER_USER_LIMIT = int(os.getenv("ADMISSION_PER_USER_LIMIT", "2"))
+ADMISSION_PER_USER_QUEUE = int(os.getenv("ADMISSION_PER_USER_QUEUE", "4"))
+# Model calls per second across all agents in this process (0 disables). Divide the
+# project quota by the number of workers.
+MODEL_RATE_LIMIT = float(os.getenv("MODEL_RATE_LIMIT", "25"))
+MODEL_RATE_BURST = int(os.getenv("MODEL_RATE_BURST", "50"))
+
+wait_seconds = registry.register(Histogram(
+    "admission_wait_seconds", "Time a query waited for its session, user and global slots."))
+model_wait_seconds = registry.register(Histogram(
+    "model_rate_wait_seconds", "Time a model call waited for the rate limiter."))
+rejected = registry.register(Counter(
+    "admission_rejected_total", "Requests shed by admission control.", ("reason",)))
+
+class Overloaded(Exception):
+    """Raised instead of queueing a request that could not finish in time."""
+
+    def __init__(self, reason: str, status_code: int = 503, retry_after: float = 1.0):
+        super().__init__(reason)
+        self.reason = reason
+        self.status_code = status_code
+        self.retry_after = max(1, math.ceil(retry_after))
+
+
+def _reject(reason: str, status_code: int = 503, retry_after: float = 1.0) -> Overloaded:
+    rejected.inc(1, reason)
+    return Overloaded(reason, status_code, retry_after)
+
+
+class TokenBucket:
+    """Paces events to `rate` per second, allowing bursts of up to `burst`.
+
+    A caller reserves a token up front and sleeps until it is due, so waiters
+    are served in arrival order without a lock or a background task.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def backlog(self) -> float:
+        """Seconds until a token reserved now would be due."""
+        self._refill()
+        return max(0.0, (1 - self._tokens) / self.rate)
+
+    def reserve(self) -> float:
+        """Takes a token and returns the seconds until it is due."""
+        wait = self.backlog()
+        self._tokens -= 1
+        return wait
+
+
+model_bucket = TokenBucket(MODEL_RATE_LIMIT, MODEL_RATE_BURST) if MODEL_RATE_LIMIT > 0 else None
+
+
+async def throttle_model_call(callback_context: CallbackContext, llm_request: LlmRequest) -> Optional[LlmResponse]:
+    """before_model_callback: waits for a model-call token.
+
+    It never sheds: the request is already admitted, and a booking tool may
+    have committed earlier in the turn, so failing now would invite a retry
+    that books twice. admit() turns requests away while the backlog is long.
+    """
+    if model_bucket is None:
+        return None
+    wait = model_bucket.reserve()
+    model_wait_seconds.observe(wait)
+    if wait:
+        await asyncio.sleep(wait)
+    return None
+
+
+async def _acquire(semaphore: asyncio.Semaphore, deadline: float):
+    if not semaphore.locked():
+        await semaphore.acquire()
+    else:
+        await asyncio.wait_for(semaphore.acquire(), max(0.0, deadline - time.monotonic()))
+
+
+class _KeyedSlots:
+    """Per-key semaphores, dropped once nobody holds or waits on them."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        # key -> [semaphore, number of requests holding or waiting on it]
+        self._entries: dict[Hashable, list] = {}
+
+    @asynccontextmanager
+    async def hold(self, key: Hashable, deadline: float):
+        entry = self._entries.setdefault(key, [asyncio.Semaphore(self.limit), 0])
+        entry[1] += 1
+        try:
+            await _acquire(entry[0], deadline)
+            try:
+                yield
+            finally:
+                entry[0].release()
+        finally:
+            entry[1] -= 1
+            if not entry[1]:
+                del self._entries[key]
+
+
+class AdmissionController:
+    """Decides when, and whether, a query gets to run its agents.
+
+    A request first waits for its session (turns on one session never run
+    concurrently), then for one of its user's slots, then for a global slot.
+    Requests are refused up front with 429 when their user already has too
+    many waiting, and with 503 when the queue is full or the expected wait
+    (from the recent average run time) or the model-call backlog would
+    exceed ADMISSION_DEADLINE. Anything still waiting for a slot at its
+    deadline is shed with 503. Once admitted, a request is never shed.
+    """
+
+    def __init__(self, max_concurrent: int = ADMISSION_MAX_CONCURRENT, queue_size: int = ADMISSION_QUEUE_SIZE,
+                 deadline: float = ADMISSION_DEADLINE, per_user_limit: int = ADMISSION_PER_USER_LIMIT,
+                 per_user_queue: int = ADMISSION_PER_USER_QUEUE):
+        self.max_concurrent = max_concurrent
+        self.queue_size = queue_size
+        self.deadline = deadline
+        self.per_user_limit = per_user_limit
+        self.per_user_queue = per_user_queue
+        self._slots = asyncio.Semaphore(max_concurrent)
+        self._sessions = _KeyedSlots(1)
+        self._users = _KeyedSlots(per_user_limit)
+        # user_id -> requests of that user waiting or running
+        self._per_user: dict[str, int] = {}
+        self.queued = 0
+        self.in_flight = 0
+        # Moving average of how long an admitted run holds its slot.
+        self._run_seconds: Optional[float] = None
+
+    def expected_wait(self) -> float:
+        if self._run_seconds is None or self.in_flight < self.max_concurrent:
+            return 0.0
+        return (self.queued + 1) / self.max_concurrent * self._run_seconds
+
+    @asynccontextmanager
+    async def admit(self, user_id: str, session_id: str):
+        if self._per_user.get(user_id, 0) >= self.per_user_limit + self.per_user_queue:
+            raise _reject("user_limit", 429)
+        if self.queued >= self.queue_size:
+            raise _reject("queue_full", 503, self.expected_wait())
+        if self.expected_wait() > self.deadline:
+            raise _reject("expected_wait", 503, self.expected_wait())
+        if model_bucket is not None and model_bucket.backlog() > self.deadline:
+            raise _reject("model_rate", 503, model_bucket.backlog())
+
+        arrived = time.monotonic()
+        deadline = arrived + self.deadline
+        self._per_user[user_id] = self._per_user.get(user_id, 0) + 1
+        try:
+            async with AsyncExitStack() as stack:
+                self.queued += 1
+                try:
+                    # Session ids are only unique per user, as in the session service.
+                    await stack.enter_async_context(self._sessions.hold((user_id, session_id), deadline))
+                    await stack.enter_async_context(self._users.hold(user_id, deadline))
+                    await _acquire(self._slots, deadline)
+                except asyncio.TimeoutError:
+                    raise _reject("deadline", 503, self.expected_wait()) from None
+                finally:
+                    self.queued -= 1
+                stack.callback(self._slots.release)
+                wait_seconds.observe(time.monotonic() - arrived)
+
+                self.in_flight += 1
+                started = time.monotonic()
+                try:
+                    yield
+                finally:
+                    self.in_flight -= 1
+                    elapsed = time.monotonic() - started
+                    self._run_seconds = elapsed if self._run_seconds is None else 0.8 * self._run_seconds + 0.2 * elapsed
+        finally:
+            self._per_user[user_id] -= 1
+            if not self._per_user[user_id]:
+                del self._per_user[user_id]
+
+    def stats(self) -> dict:
+        return {
+            "queued": self.queued,
+            "in_flight": self.in_flight,
+            "expected_wait_s": self.expected_wait(),
+            "avg_run_s": self._run_seconds,
+        }
+
+
+admission = AdmissionController()
+
+registry.register(Gauge("admission_queue_depth", "Queries waiting for admission.", lambda: admission.queued))
+registry.register(Gauge("admission_in_flight", "Queries running their agents.", lambda: admission.in_flight))
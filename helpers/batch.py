@@ -0,0 +1,141 @@
+# helpers/batch.py
+
+import asyncio
+import json
+import os
+import time
+import uuid
+from collections import deque
+from typing import AsyncContextManager, AsyncIterable, AsyncIterator, Awaitable, Callable, Iterable, Optional, Union
+
+from google.adk.runners import Runner
+from google.adk.sessions import BaseSessionService
+
+from helpers.utils import get_or_create_session, process_query
+
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "8"))
+
+
+class _UserQueue:
+    """Items of one phone number, answered in input order by a single worker."""
+
+    def __init__(self, phone_number: Optional[str]):
+        self.phone_number = phone_number
+        self.items = deque()
+        self.worker: Optional[asyncio.Task] = None
+        self.user_id: Optional[str] = None
+        self.default_session_id: Optional[str] = None
+        self.known_sessions: set[str] = set()
+
+
+class BatchRunner:
+    """Runs JSONL query items (the QueryRequest shape) through the agent runners.
+
+    Items run with bounded concurrency overall, but items sharing a phone
+    number run one after another in input order, authenticate once, and share
+    one session unless they name their own session_id. Each run goes through
+    `admit(user_id, session_id)`, the same admission control as /query, so
+    batch items share its global and per-session limits; an item it sheds
+    becomes an error result. Results are yielded as they finish, each tagged
+    with its input line index.
+    """
+
+    def __init__(
+        self,
+        authenticate: Callable[[str], Awaitable[str]],
+        session_service: BaseSessionService,
+        pick_runner: Callable[[str], Runner],
+        admit: Callable[[str, str], AsyncContextManager],
+        concurrency: int = BATCH_CONCURRENCY,
+    ):
+        self.authenticate = authenticate
+        self.session_service = session_service
+        self.pick_runner = pick_runner
+        self.admit = admit
+        self.concurrency = concurrency
+
+    async def run(self, lines: Union[Iterable[str], AsyncIterable[str]]) -> AsyncIterator[dict]:
+        semaphore = asyncio.Semaphore(self.concurrency)
+        results: asyncio.Queue = asyncio.Queue()
+        users: dict[Optional[str], _UserQueue] = {}
+        workers: list[asyncio.Task] = []
+
+        async def drain(user: _UserQueue):
+            while user.items:
+                index, item = user.items.popleft()
+                queued_at = time.perf_counter()
+                async with semaphore:
+                    await results.put(await self._run_item(user, index, item, queued_at))
+
+        try:
+            index = -1
+            async for line in _aiter(lines):
+                if not line.strip():
+                    continue
+                index += 1
+                try:
+                    item = json.loads(line)
+                    if not isinstance(item, dict) or not isinstance(item.get("query"), str):
+                        raise ValueError("expected an object with a string 'query'")
+                except ValueError as e:
+                    await results.put({"index": index, "error": f"invalid item: {e}"})
+                    continue
+                phone_number = item.get("phone_number")
+                user = users.setdefault(phone_number, _UserQueue(phone_number))
+                user.items.append((index, item))
+                if user.worker is None or user.worker.done():
+                    user.worker = asyncio.ensure_future(drain(user))
+                    workers.append(user.worker)
+                while not results.empty():
+                    yield results.get_nowait()
+
+            pending = asyncio.ensure_future(asyncio.gather(*workers))
+            while not (pending.done() and results.empty()):
+                getter = asyncio.ensure_future(results.get())
+                await asyncio.wait({getter, pending}, return_when=asyncio.FIRST_COMPLETED)
+                if getter.done():
+                    yield getter.result()
+                else:
+                    getter.cancel()
+            pending.result()
+        finally:
+            for worker in workers:
+                worker.cancel()
+
+    async def _run_item(self, user: _UserQueue, index: int, item: dict, queued_at: float) -> dict:
+        started_at = time.perf_counter()
+        result = {"index": index, "user_id": None, "session_id": None}
+        try:
+            if user.user_id is None:
+                user.user_id = await self.authenticate(user.phone_number)
+                if user.user_id is None:
+                    raise ValueError(f"could not authenticate {user.phone_number}")
+            result["user_id"] = user.user_id
+
+            session_id = item.get("session_id")
+            if not session_id:
+                user.default_session_id = user.default_session_id or f"session_{uuid.uuid4().hex[:8]}"
+                session_id = user.default_session_id
+            if session_id not in user.known_sessions:
+                await get_or_create_session(self.session_service, user.user_id, session_id)
+                user.known_sessions.add(session_id)
+            result["session_id"] = session_id
+
+            async with self.admit(user.user_id, session_id):
+                response_text = await process_query(self.pick_runner(item["query"]), user.user_id, session_id,
+                                                    item["query"])
+            result["response"] = response_text or "No response from agent."
+        except Exception as e:
+            result["error"] = f"{type(e).__name__}: {e}"
+        result["wait_ms"] = (started_at - queued_at) * 1000
+        result["latency_ms"] = (time.perf_counter() - started_at) * 1000
+        return result
+
+
+async def _aiter(lines):
+    if hasattr(lines, "__aiter__"):
+        async for line in lines:
+            yield line
+    else:
+        for line in lines:
+            yield line
@@ -0,0 +1,79 @@
+# helpers/booking_generation.py
+
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+# With the sqlite session backend every worker shares the count through the session database,
+# so a booking on one worker stops the others serving cached availability.
+BOOKING_GENERATION_DB = (os.getenv("SESSION_DB_PATH", "sessions.db")
+                         if os.getenv("SESSION_BACKEND", "memory") == "sqlite" else "")
+# Seconds a shared count read from the database is reused, so another worker's booking
+# is noticed within this long. Bookings made by this process are seen at once.
+BOOKING_GENERATION_POLL = float(os.getenv("BOOKING_GENERATION_POLL", "1"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS booking_generation (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    generation INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO booking_generation (id, generation) VALUES (0, 0);
+"""
+
+
+class BookingGeneration:
+    """Counts the booking tool calls that may have changed bookings or availability.
+
+    Cached tool results and cached answers record the generation they were
+    computed in and are not served once it has moved on. Without a db_path
+    the count is local to this process; with one it is a row in that SQLite
+    file shared by every worker. The row is read in a worker thread, at most
+    once per `poll` seconds, with concurrent checks sharing one read.
+    """
+
+    def __init__(self, db_path: str = BOOKING_GENERATION_DB, poll: float = BOOKING_GENERATION_POLL):
+        self.db_path = db_path
+        self.poll = poll
+        self._local = threading.local()
+        self._generation = 0
+        self._fresh_until = 0.0
+        self._read: Optional[asyncio.Future] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def _read_shared(self) -> int:
+        return self._connection().execute("SELECT generation FROM booking_generation WHERE id = 0").fetchone()[0]
+
+    def _bump_shared(self) -> int:
+        return self._connection().execute(
+            "UPDATE booking_generation SET generation = generation + 1 WHERE id = 0 RETURNING generation").fetchall()[0][0]
+
+    async def current(self) -> int:
+        if self.db_path and time.monotonic() >= self._fresh_until:
+            if self._read is None or self._read.done():
+                self._read = asyncio.ensure_future(asyncio.to_thread(self._read_shared))
+            generation = await asyncio.shield(self._read)
+            # The count only grows; a read that started before one of our own bumps must not undo it.
+            self._generation = max(self._generation, generation)
+            self._fresh_until = time.monotonic() + self.poll
+        return self._generation
+
+    async def bump(self):
+        if not self.db_path:
+            self._generation += 1
+            return
+        # A write may wait behind another worker's transaction; keep that off the event loop.
+        self._generation = max(self._generation, await asyncio.to_thread(self._bump_shared))
+
+
+booking_generation = BookingGeneration()
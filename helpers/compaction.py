@@ -0,0 +1,241 @@
+# helpers/compaction.py
+
+import json
+import os
+import re
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.events.event import Event
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.adk.sessions import InMemorySessionService, Session
+from google.genai import types
+
+# Most recent events kept in storage and contents sent to the model; 0 disables compaction.
+SESSION_WINDOW_EVENTS = int(os.getenv("SESSION_WINDOW_EVENTS", "30"))
+# Sessions untouched for this many seconds are evicted from the in-memory service.
+SESSION_IDLE_TTL = float(os.getenv("SESSION_IDLE_TTL", "3600"))
+# Least recently used sessions are evicted above this count.
+SESSION_MAX_SESSIONS = int(os.getenv("SESSION_MAX_SESSIONS", "10000"))
+
+# Only sessions of the /query app are tracked, not the throwaway ones AgentTool creates.
+APP_NAME = "travel_coordinator_agent"
+# Session state key holding what was folded out of the window.
+CONTEXT_KEY = "conversation_context"
+MAX_EARLIER_REQUESTS = 5
+
+# Tool arguments worth remembering once the call itself leaves the window.
+TRACKED_ARGS = frozenset({
+    "customer_name", "booking_id", "booking_type", "booking_date", "service_id", "total_amount",
+    "hotel_id", "restaurant_id", "name", "location", "price_tier", "cuisine_type",
+    "departure_city", "arrival_city", "departure_date", "airline",
+    "pickup_location", "pickup_date", "return_date", "vehicle_type",
+})
+_ID_PATTERN = re.compile(r"\b(hotel|restaurant|flight|car|booking)\s*(?:id\s*)?#?\s*(\d+)\b", re.IGNORECASE)
+_DATE_PATTERN = re.compile(r"\b\d{4}-\d{2}-\d{2}\b")
+
+
+def _remember_text(details: dict, text: str):
+    for kind, value in _ID_PATTERN.findall(text):
+        details[f"{kind.lower()}_id"] = int(value)
+    dates = details.get("dates", [])
+    for date in _DATE_PATTERN.findall(text):
+        if date not in dates:
+            dates.append(date)
+    if dates:
+        details["dates"] = dates[-4:]
+
+
+def fold_contents(context: Optional[dict], contents: list[types.Content]) -> dict:
+    """Folds contents leaving the window into a compact structured summary."""
+    context = json.loads(json.dumps(context or {}))
+    details = context.setdefault("details", {})
+    requests = context.setdefault("earlier_requests", [])
+    for content in contents:
+        for part in content.parts or []:
+            if part.function_call and part.function_call.args:
+                for key, value in part.function_call.args.items():
+                    if key in TRACKED_ARGS and value not in (None, ""):
+                        details[key] = value
+                    elif key == "request" and isinstance(value, str):
+                        _remember_text(details, value)
+            elif content.role == "user" and part.text:
+                requests.append(part.text[:200])
+                _remember_text(details, part.text)
+    context["earlier_requests"] = requests[-MAX_EARLIER_REQUESTS:]
+    return context
+
+
+def _window_start(items: list, is_turn_start, window: int) -> int:
+    """Index of the first user turn inside the last `window` items (0 if none)."""
+    for i in range(max(0, len(items) - window), len(items)):
+        if is_turn_start(items[i]):
+            return i
+    return 0
+
+
+def _is_user_text(content: Optional[types.Content]) -> bool:
+    return bool(content) and content.role == "user" and any(part.text for part in content.parts or [])
+
+
+def _estimate_tokens(contents: list[types.Content], system_instruction) -> int:
+    chars = len(str(system_instruction or ""))
+    for content in contents:
+        for part in content.parts or []:
+            if part.text:
+                chars += len(part.text)
+            elif part.function_call:
+                chars += len(json.dumps(part.function_call.args or {}, default=str))
+            elif part.function_response:
+                chars += len(json.dumps(part.function_response.response or {}, default=str))
+    return chars // 4
+
+
+class SessionStats:
+    """Per-session memory and prompt size figures, bounded to the most recent sessions."""
+
+    def __init__(self, max_sessions: int = 1000):
+        self.max_sessions = max_sessions
+        self._sessions: OrderedDict[str, dict] = OrderedDict()
+
+    def get(self, session_id: str) -> dict:
+        stats = self._sessions.pop(session_id, None) or {}
+        self._sessions[session_id] = stats
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+        return stats
+
+    def drop(self, session_id: str):
+        self._sessions.pop(session_id, None)
+
+    def snapshot(self) -> dict:
+        totals = {}
+        for stats in self._sessions.values():
+            for key, value in stats.items():
+                totals[key] = totals.get(key, 0) + value
+        return {"sessions": len(self._sessions), "totals": totals, "per_session": dict(self._sessions)}
+
+
+session_stats = SessionStats()
+
+
+def _stats_for(callback_context: CallbackContext) -> Optional[dict]:
+    session = callback_context._invocation_context.session
+    return session_stats.get(session.id) if session.app_name == APP_NAME else None
+
+
+def compact_history(callback_context: CallbackContext, llm_request: LlmRequest) -> Optional[LlmResponse]:
+    """before_model_callback: sends only the recent window plus a summary of earlier turns."""
+    contents = llm_request.contents
+    before = _estimate_tokens(contents, llm_request.config.system_instruction)
+    context = callback_context.state.get(CONTEXT_KEY)
+    if SESSION_WINDOW_EVENTS and len(contents) > SESSION_WINDOW_EVENTS:
+        start = _window_start(contents, _is_user_text, SESSION_WINDOW_EVENTS)
+        if start:
+            context = fold_contents(context, contents[:start])
+            llm_request.contents = contents[start:]
+    if context:
+        llm_request.append_instructions([
+            "Context from earlier in this conversation (older messages are not shown): "
+            + json.dumps(context, default=str)
+        ])
+
+    stats = _stats_for(callback_context)
+    if stats is not None:
+        stats["model_calls"] = stats.get("model_calls", 0) + 1
+        stats["est_prompt_tokens_before_window"] = stats.get("est_prompt_tokens_before_window", 0) + before
+        stats["est_prompt_tokens_sent"] = stats.get("est_prompt_tokens_sent", 0) + _estimate_tokens(
+            llm_request.contents, llm_request.config.system_instruction)
+    return None
+
+
+def record_usage(callback_context: CallbackContext, llm_response: LlmResponse) -> Optional[LlmResponse]:
+    """after_model_callback: accumulates the prompt tokens the model actually billed.
+
+    Streamed calls run this once per chunk and again for the aggregate; only non-partial responses count.
+    """
+    if llm_response.partial:
+        return None
+    usage = llm_response.usage_metadata
+    stats = _stats_for(callback_context) if usage and usage.prompt_token_count else None
+    if stats is not None:
+        stats["prompt_tokens"] = stats.get("prompt_tokens", 0) + usage.prompt_token_count
+    return None
+
+
+class CompactingInMemorySessionService(InMemorySessionService):
+    """InMemorySessionService that bounds per-session and total memory.
+
+    Once a session holds more than SESSION_WINDOW_EVENTS events (plus half a
+    window of slack, so compaction is amortized), older turns are folded into
+    state[CONTEXT_KEY] and dropped. Idle sessions expire after SESSION_IDLE_TTL
+    and the least recently used ones go once SESSION_MAX_SESSIONS is exceeded.
+    """
+
+    def __init__(self, window: int = SESSION_WINDOW_EVENTS, idle_ttl: float = SESSION_IDLE_TTL,
+                 max_sessions: int = SESSION_MAX_SESSIONS):
+        super().__init__()
+        self.window = window
+        self.idle_ttl = idle_ttl
+        self.max_sessions = max_sessions
+        self._last_used: OrderedDict[tuple, float] = OrderedDict()
+        self.evicted = 0
+
+    def _touch(self, app_name: str, user_id: str, session_id: str):
+        key = (app_name, user_id, session_id)
+        self._last_used.pop(key, None)
+        self._last_used[key] = time.time()
+
+    def _evict_idle(self):
+        now = time.time()
+        while self._last_used:
+            (app_name, user_id, session_id), last_used = next(iter(self._last_used.items()))
+            if len(self._last_used) <= self.max_sessions and now - last_used < self.idle_ttl:
+                break
+            self._last_used.popitem(last=False)
+            self.sessions.get(app_name, {}).get(user_id, {}).pop(session_id, None)
+            session_stats.drop(session_id)
+            self.evicted += 1
+
+    async def create_session(self, *, app_name: str, user_id: str, state=None, session_id=None) -> Session:
+        self._evict_idle()
+        session = await super().create_session(app_name=app_name, user_id=user_id, state=state, session_id=session_id)
+        self._touch(app_name, user_id, session.id)
+        return session
+
+    async def get_session(self, *, app_name: str, user_id: str, session_id: str, config=None) -> Optional[Session]:
+        session = await super().get_session(app_name=app_name, user_id=user_id, session_id=session_id, config=config)
+        if session is not None:
+            self._touch(app_name, user_id, session_id)
+        return session
+
+    async def delete_session(self, *, app_name: str, user_id: str, session_id: str) -> None:
+        await super().delete_session(app_name=app_name, user_id=user_id, session_id=session_id)
+        self._last_used.pop((app_name, user_id, session_id), None)
+        session_stats.drop(session_id)
+
+    async def append_event(self, session: Session, event: Event) -> Event:
+        await super().append_event(session=session, event=event)
+        storage = self.sessions.get(session.app_name, {}).get(session.user_id, {}).get(session.id)
+        if storage is None or event.partial:
+            return event
+        self._touch(session.app_name, session.user_id, session.id)
+
+        stats = session_stats.get(session.id)
+        stats["memory_bytes"] = stats.get("memory_bytes", 0) + len(event.model_dump_json(exclude_none=True))
+        if self.window and len(storage.events) > self.window + self.window // 2:
+            start = _window_start(storage.events, lambda e: e.author == "user", self.window)
+            if start:
+                dropped = storage.events[:start]
+                storage.state[CONTEXT_KEY] = fold_contents(
+                    storage.state.get(CONTEXT_KEY), [e.content for e in dropped if e.content])
+                storage.events = storage.events[start:]
+                kept_bytes = sum(len(e.model_dump_json(exclude_none=True)) for e in storage.events)
+                stats["bytes_compacted"] = stats.get("bytes_compacted", 0) + stats["memory_bytes"] - kept_bytes
+                stats["events_compacted"] = stats.get("events_compacted", 0) + len(dropped)
+                stats["memory_bytes"] = kept_bytes
+        stats["events_stored"] = len(storage.events)
+        return event
@@ -0,0 +1,59 @@
+# helpers/fanout.py
+
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from typing import Any
+
+from google.adk.agents import BaseAgent
+from google.adk.tools.agent_tool import AgentTool
+from google.adk.tools.tool_context import ToolContext
+
+from helpers.metrics import subagent_seconds, timed
+
+# Specialist agents one /query may run at the same time; 1 restores sequential execution.
+AGENT_FANOUT_LIMIT = int(os.getenv("AGENT_FANOUT_LIMIT", "3"))
+# Specialist agents running at the same time across all requests in this process.
+AGENT_FANOUT_GLOBAL_LIMIT = int(os.getenv("AGENT_FANOUT_GLOBAL_LIMIT", "32"))
+
+
+class FanoutLimiter:
+    """Caps concurrent specialist runs per invocation and process-wide."""
+
+    def __init__(self, per_request: int = AGENT_FANOUT_LIMIT, global_limit: int = AGENT_FANOUT_GLOBAL_LIMIT):
+        self.per_request = per_request
+        self._global = asyncio.Semaphore(global_limit)
+        # invocation_id -> [semaphore, number of calls holding or waiting on it]
+        self._requests: dict[str, list] = {}
+
+    @asynccontextmanager
+    async def slot(self, invocation_id: str):
+        entry = self._requests.setdefault(invocation_id, [asyncio.Semaphore(self.per_request), 0])
+        entry[1] += 1
+        try:
+            async with entry[0], self._global:
+                yield
+        finally:
+            entry[1] -= 1
+            if not entry[1]:
+                del self._requests[invocation_id]
+
+
+fanout_limiter = FanoutLimiter()
+
+
+class BoundedAgentTool(AgentTool):
+    """AgentTool whose parallel calls from one coordinator turn go through a FanoutLimiter.
+
+    ADK already runs every function call of a single model response concurrently;
+    this keeps a multi-service request from starting more specialists than allowed.
+    """
+
+    def __init__(self, agent: BaseAgent, skip_summarization: bool = False, limiter: FanoutLimiter = None):
+        super().__init__(agent, skip_summarization=skip_summarization)
+        self.limiter = limiter or fanout_limiter
+
+    async def run_async(self, *, args: dict[str, Any], tool_context: ToolContext) -> Any:
+        with timed(subagent_seconds, self.agent.name):
+            async with self.limiter.slot(tool_context.invocation_id):
+                return await super().run_async(args=args, tool_context=tool_context)
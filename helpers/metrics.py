@@ -0,0 +1,209 @@
+# helpers/metrics.py
+
+import bisect
+import functools
+import os
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Callable, Optional
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+
+# Set to "false" to turn every timer and counter into a no-op.
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() != "false"
+# Also open an OpenTelemetry span per phase; ADK's own model and tool spans nest under them.
+METRICS_OTEL_SPANS = os.getenv("METRICS_OTEL_SPANS", "false").lower() == "true"
+
+# Seconds; covers a cache hit (sub-millisecond) up to a slow multi-agent turn.
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+_tracer = None
+if METRICS_OTEL_SPANS:
+    from opentelemetry import trace
+    _tracer = trace.get_tracer("travel_agent")
+
+
+def _format_labels(labelnames: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: tuple = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1, *labels):
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for labels, value in self._values.items():
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {value:g}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.buckets = buckets
+        # labels -> [per-bucket counts (last one is +Inf), sum]
+        self._series: dict[tuple, list] = {}
+
+    def observe(self, value: float, *labels):
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total) in self._series.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{bound:g}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {total:g}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+class Gauge:
+    """A value read at scrape time, e.g. from an existing stats() method."""
+
+    def __init__(self, name: str, help: str, read: Callable[[], float]):
+        self.name = name
+        self.help = help
+        self.read = read
+
+    def render(self) -> list[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge", f"{self.name} {self.read():g}"]
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+phase_seconds = registry.register(Histogram(
+    "agent_phase_seconds", "Time spent in each phase of a query request.", ("phase",)))
+model_seconds = registry.register(Histogram(
+    "agent_model_call_seconds", "Model call latency per agent.", ("agent",)))
+model_tokens = registry.register(Counter(
+    "agent_model_tokens_total", "Tokens billed per agent, by prompt or candidates.", ("agent", "kind")))
+subagent_seconds = registry.register(Histogram(
+    "agent_subagent_seconds", "Specialist agent runs started by the coordinator, including fan-out waits.", ("agent",)))
+tool_seconds = registry.register(Histogram(
+    "agent_tool_call_seconds", "Toolbox tool latency as seen by the agent, cache hits included.", ("tool",)))
+tool_calls = registry.register(Counter(
+    "agent_tool_calls_total", "Toolbox tool calls by outcome.", ("tool", "outcome")))
+
+
+@contextmanager
+def timed(histogram: Histogram, *labels):
+    """Observes the duration of the block in `histogram` (and an OTel span if enabled)."""
+    if not METRICS_ENABLED:
+        yield
+        return
+    span = _tracer.start_as_current_span(":".join((histogram.name,) + labels)) if _tracer else nullcontext()
+    with span:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            histogram.observe(time.perf_counter() - start, *labels)
+
+
+def phase(name: str):
+    return timed(phase_seconds, name)
+
+
+def record_phase(name: str, seconds: float):
+    """For phases that span generator yields, where a span cannot be kept current."""
+    if METRICS_ENABLED:
+        phase_seconds.observe(seconds, name)
+
+
+def instrument_tool(tool):
+    """Wraps an async toolbox tool with call counting and timing."""
+    name = tool.__name__
+
+    @functools.wraps(tool)
+    async def call(**kwargs):
+        if not METRICS_ENABLED:
+            return await tool(**kwargs)
+        outcome = "error"
+        try:
+            with timed(tool_seconds, name):
+                result = await tool(**kwargs)
+            outcome = "ok"
+            return result
+        finally:
+            tool_calls.inc(1, name, outcome)
+
+    call.__signature__ = tool.__signature__
+    return call
+
+
+# (invocation_id, agent name) -> perf_counter() at the start of the model call.
+_model_started: dict[tuple, float] = {}
+# A call that raised never reaches after_model_callback; entries older than this are dropped.
+_MODEL_STARTED_MAX_AGE = 600
+
+
+def start_model_timer(callback_context: CallbackContext, llm_request: LlmRequest) -> Optional[LlmResponse]:
+    """before_model_callback: notes when the model call starts."""
+    if METRICS_ENABLED:
+        now = time.perf_counter()
+        if len(_model_started) > 1000:
+            for key, started in list(_model_started.items()):
+                if now - started > _MODEL_STARTED_MAX_AGE:
+                    del _model_started[key]
+        _model_started[(callback_context.invocation_id, callback_context.agent_name)] = now
+    return None
+
+
+def record_model_metrics(callback_context: CallbackContext, llm_response: LlmResponse) -> Optional[LlmResponse]:
+    """after_model_callback: records model latency and token counts for the agent.
+
+    Streamed calls run this once per chunk; only the final chunk is recorded.
+    """
+    if not METRICS_ENABLED or llm_response.partial:
+        return None
+    agent = callback_context.agent_name
+    started = _model_started.pop((callback_context.invocation_id, agent), None)
+    if started is not None:
+        model_seconds.observe(time.perf_counter() - started, agent)
+    usage = llm_response.usage_metadata
+    if usage:
+        if usage.prompt_token_count:
+            model_tokens.inc(usage.prompt_token_count, agent, "prompt")
+        if usage.candidates_token_count:
+            model_tokens.inc(usage.candidates_token_count, agent, "candidates")
+    return None
@@ -0,0 +1,127 @@
+# helpers/response_cache.py
+
+import hashlib
+import os
+import re
+from typing import Awaitable, Callable
+
+from cachetools import TTLCache
+from google.adk.tools.agent_tool import AgentTool
+
+from helpers.booking_generation import booking_generation
+from helpers.metrics import Counter, registry
+
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "1024"))
+# Seconds a first-turn answer is reused. 0, the default, turns the cache off.
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "0"))
+
+lookups = registry.register(Counter(
+    "response_cache_requests_total", "First-turn queries by response cache outcome.", ("outcome",)))
+saved_seconds = registry.register(Counter(
+    "response_cache_saved_seconds_total", "Agent run time avoided by answering from the response cache."))
+
+
+def normalize_query(query: str) -> str:
+    """Case, surrounding punctuation and runs of whitespace do not change the answer."""
+    return re.sub(r"\s+", " ", query).strip(" .?!").lower()
+
+
+def agent_tree_version(root_agent, tools_yaml_path: str) -> str:
+    """Hash of every agent's model, description and instruction, plus tools.yaml.
+
+    Changing a prompt or a tool definition changes the version, so answers
+    cached under the old one are never served.
+    """
+    digest = hashlib.sha256()
+    pending, seen = [root_agent], set()
+    while pending:
+        agent = pending.pop()
+        if agent.name in seen:
+            continue
+        seen.add(agent.name)
+        model = getattr(agent, "model", "")
+        instruction = getattr(agent, "instruction", "")
+        for part in (agent.name, getattr(model, "model", model), agent.description,
+                     instruction if isinstance(instruction, str) else getattr(instruction, "__qualname__", "")):
+            digest.update(str(part).encode() + b"\0")
+        pending.extend(agent.sub_agents)
+        pending.extend(tool.agent for tool in getattr(agent, "tools", []) if isinstance(tool, AgentTool))
+    if os.path.exists(tools_yaml_path):
+        with open(tools_yaml_path, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+class ResponseCache:
+    """LRU+TTL cache of final answers to first-turn queries.
+
+    Keyed on the normalized query, the agent that answers it (coordinator or
+    fast-path specialist) and the agent tree version. Turns answered by, or
+    calling, an agent in `skip` (the booking agent) are never cached: their
+    answers depend on who is asking and change what later answers should
+    say. An entry is also not served once the booking generation has moved
+    since it was computed, i.e. after any booking tool call on this worker,
+    or on another one sharing the session database (noticed within
+    BOOKING_GENERATION_POLL), the same signal that clears the tool
+    result cache.
+    """
+
+    def __init__(self, version: str, skip: frozenset = frozenset(), maxsize: int = RESPONSE_CACHE_SIZE,
+                 ttl: float = RESPONSE_CACHE_TTL):
+        self.version = version
+        self.skip = skip
+        self.enabled = maxsize > 0 and ttl > 0
+        # key -> (response text, seconds the agent run took, booking generation)
+        self._cache = TTLCache(maxsize=max(maxsize, 1), ttl=max(ttl, 1))
+        self.hits = 0
+        self.misses = 0
+        self.skipped = 0
+        self.saved_seconds = 0.0
+
+    def key(self, query: str, agent_name: str) -> str:
+        return f"{self.version}:{agent_name}:{normalize_query(query)}"
+
+    async def get_or_run(self, query: str, agent_name: str,
+                         run: Callable[[], Awaitable[tuple[str, set, float]]]) -> tuple[str, bool]:
+        """Returns (response, served from cache).
+
+        `run` returns the response, the names it called and the seconds the agents ran, not counting
+        any admission wait; that time is what a later hit saves.
+        """
+        if not self.enabled:
+            return (await run())[0], False
+        if agent_name in self.skip:
+            self.skipped += 1
+            lookups.inc(1, "skip")
+            return (await run())[0], False
+
+        key = self.key(query, agent_name)
+        cached = self._cache.get(key)
+        if cached is not None and cached[2] == await booking_generation.current():
+            self.hits += 1
+            self.saved_seconds += cached[1]
+            lookups.inc(1, "hit")
+            saved_seconds.inc(cached[1])
+            return cached[0], True
+
+        self.misses += 1
+        lookups.inc(1, "miss")
+        generation = await booking_generation.current()
+        response, calls, run_seconds = await run()
+        if response and not calls & self.skip and generation == await booking_generation.current():
+            self._cache[key] = (response, run_seconds, generation)
+        return response, False
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "version": self.version,
+            "hits": self.hits,
+            "misses": self.misses,
+            "skipped": self.skipped,
+            "hit_rate": self.hits / total if total else 0.0,
+            "saved_seconds": self.saved_seconds,
+            "avg_saved_ms": self.saved_seconds / self.hits * 1000 if self.hits else 0.0,
+            "size": len(self._cache),
+        }
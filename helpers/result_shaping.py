@@ -0,0 +1,115 @@
+# helpers/result_shaping.py
+
+import base64
+import binascii
+import functools
+import inspect
+import json
+import os
+from typing import Optional
+
+# Rows handed to the model per tool call. Tools with keyset parameters offer the rest as further pages.
+TOOL_RESULT_MAX_ROWS = int(os.getenv("TOOL_RESULT_MAX_ROWS", "20"))
+# "columnar" sends {"columns": [...], "rows": [[...], ...]}; "objects" keeps one JSON object per row.
+TOOL_RESULT_FORMAT = os.getenv("TOOL_RESULT_FORMAT", "columnar")
+# Columns never worth the model's tokens, e.g. from the booking tools' RETURNING *.
+TOOL_RESULT_DROP_COLUMNS = frozenset(
+    column.strip() for column in os.getenv("TOOL_RESULT_DROP_COLUMNS", "created_at,updated_at").split(",") if column.strip()
+)
+
+# tools.yaml conventions: `after_<column>` parameters are the keyset of the previous page's
+# last row, in ORDER BY order, and `max_rows` is the statement's LIMIT.
+CURSOR_PREFIX = "after_"
+LIMIT_PARAM = "max_rows"
+PAGE_TOKEN_PARAM = "page_token"
+
+
+def encode_page_token(values: list) -> str:
+    return base64.urlsafe_b64encode(json.dumps(values, separators=(",", ":")).encode()).decode()
+
+
+def decode_page_token(token: str, cursor_params: list[str]) -> dict:
+    """Turns a page token back into the tool's `after_*` arguments. Raises ValueError if it is not one of ours."""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(token.encode()))
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError):
+        raise ValueError("malformed page token") from None
+    if not isinstance(values, list) or len(values) != len(cursor_params):
+        raise ValueError("page token does not belong to this tool")
+    return dict(zip(cursor_params, values))
+
+
+def encode_rows(rows: list[dict]) -> dict:
+    """Projects away TOOL_RESULT_DROP_COLUMNS and encodes rows in TOOL_RESULT_FORMAT."""
+    columns = [column for column in rows[0] if column not in TOOL_RESULT_DROP_COLUMNS] if rows else []
+    if TOOL_RESULT_FORMAT == "objects":
+        return {"rows": [{column: row.get(column) for column in columns} for row in rows]}
+    return {"columns": columns, "rows": [[row.get(column) for column in columns] for row in rows]}
+
+
+def _docstring(doc: str, hidden: set[str], paginated: bool) -> str:
+    description, _, args = (doc or "").partition("\n\nArgs:")
+    lines = [line for line in args.splitlines() if line.strip() and line.split()[0] not in hidden]
+    if paginated:
+        description += (f" Returns at most {TOOL_RESULT_MAX_ROWS} rows; when more match, the result includes a"
+                        f" next_page_token. To see more, call again with the same arguments and {PAGE_TOKEN_PARAM}"
+                        " set to that token.")
+        lines.append(f"    {PAGE_TOKEN_PARAM} (str): Optional next_page_token from a previous call.")
+    return description + ("\n\nArgs:\n" + "\n".join(lines) if lines else "")
+
+
+def shape_results(tool):
+    """Wraps a toolbox tool so the model gets capped, compactly encoded results.
+
+    Tools whose statements take `after_*` keyset parameters are paged: the
+    model sees a single `page_token` argument instead, and each page ends with
+    a token holding the keyset of its last row. The statement is asked for one
+    row more than TOOL_RESULT_MAX_ROWS to learn whether another page exists.
+    Tools without keyset parameters are truncated to the cap client-side.
+    """
+    signature = tool.__signature__
+    cursor_params = [name for name in signature.parameters if name.startswith(CURSOR_PREFIX)]
+    hidden = set(cursor_params) | {LIMIT_PARAM}
+    has_limit = LIMIT_PARAM in signature.parameters
+
+    @functools.wraps(tool)
+    async def call(**kwargs):
+        page_token = kwargs.pop(PAGE_TOKEN_PARAM, None)
+        if page_token and cursor_params:
+            try:
+                kwargs.update(decode_page_token(page_token, cursor_params))
+            except ValueError as e:
+                return {"error": f"Invalid {PAGE_TOKEN_PARAM} ({e}); call again without it to start from the first page."}
+        if has_limit:
+            kwargs[LIMIT_PARAM] = TOOL_RESULT_MAX_ROWS + 1
+
+        result = await tool(**kwargs)
+        try:
+            rows = json.loads(result) if isinstance(result, str) else result
+        except json.JSONDecodeError:
+            return result
+        if rows is None:
+            rows = []
+        if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+            return result
+
+        more = len(rows) > TOOL_RESULT_MAX_ROWS
+        rows = rows[:TOOL_RESULT_MAX_ROWS]
+        shaped = encode_rows(rows)
+        if more:
+            last = rows[-1]
+            keyset = [name[len(CURSOR_PREFIX):] for name in cursor_params]
+            if keyset and all(column in last for column in keyset):
+                shaped["next_page_token"] = encode_page_token([last[column] for column in keyset])
+            else:
+                shaped["truncated"] = True
+        return shaped
+
+    parameters = [param for name, param in signature.parameters.items() if name not in hidden]
+    if cursor_params:
+        parameters.append(inspect.Parameter(PAGE_TOKEN_PARAM, inspect.Parameter.POSITIONAL_OR_KEYWORD,
+                                            default=None, annotation=Optional[str]))
+    call.__signature__ = signature.replace(parameters=parameters, return_annotation=dict)
+    call.__annotations__ = {param.name: param.annotation for param in parameters}
+    call.__doc__ = _docstring(tool.__doc__, hidden, bool(cursor_params))
+    return call
@@ -0,0 +1,135 @@
+# helpers/router.py
+
+import importlib
+import logging
+import os
+import re
+from collections import Counter
+from typing import Optional, Protocol
+
+# Routes are the specialist agent names; COORDINATOR means "let root_agent decide".
+COORDINATOR = "travel_coordinator_agent"
+
+# Mirrors the routing table in the travel_coordinator_agent instruction.
+ROUTE_KEYWORDS = {
+    "hotels_agent": ["hotel", "hotels", "accommodation", "accommodations", "stay", "room", "rooms",
+                     "lodge", "resort", "resorts", "inn", "amenities", "amenity"],
+    "flights_agent": ["flight", "flights", "airline", "airlines", "fly", "flying", "plane", "airport",
+                      "ticket", "tickets", "departure", "departures", "arrival", "arrivals", "seats"],
+    "restaurants_agent": ["restaurant", "restaurants", "food", "dining", "dine", "eat", "cuisine",
+                          "menu", "breakfast", "lunch", "dinner"],
+    "car_rental_agent": ["car", "cars", "rental", "rent", "drive", "vehicle", "vehicles", "pickup",
+                         "suv", "suvs", "sedan", "economy"],
+    "booking_management_agent": ["book", "booking", "bookings", "reserve", "reservation",
+                                 "reservations", "cancel", "confirm", "customer", "my bookings"],
+}
+
+# Words that signal a multi-service plan, which only the coordinator can combine.
+MULTI_SERVICE_KEYWORDS = ["trip", "itinerary", "plan", "planning", "vacation", "holiday", "package"]
+
+# Keywords that also show up in other domains' queries; they neither decide nor block a route.
+WEAK_KEYWORDS = {"airport", "pickup", "stay", "confirm", "customer", "economy"}
+
+
+class Router(Protocol):
+    def classify(self, query: str) -> Optional[str]:
+        """Returns the specialist agent name for the query, or None to use the coordinator."""
+
+
+def _keyword_pattern(keywords) -> re.Pattern:
+    return re.compile(r"\b(" + "|".join(re.escape(k) for k in sorted(keywords, key=len, reverse=True)) + r")\b")
+
+
+class KeywordRouter:
+    """Routes a query to a specialist when exactly one domain's keywords match it.
+
+    Domains matched only through weak keywords are ignored. Anything ambiguous
+    (several domains, booking combined with a search, a multi-service plan, or
+    no strong keyword at all) goes to the coordinator.
+    """
+
+    def __init__(self, route_keywords: dict = ROUTE_KEYWORDS, multi_service_keywords=MULTI_SERVICE_KEYWORDS,
+                 weak_keywords=WEAK_KEYWORDS):
+        self._patterns = {route: _keyword_pattern(keywords) for route, keywords in route_keywords.items()}
+        self._multi_service = _keyword_pattern(multi_service_keywords)
+        self._weak_keywords = weak_keywords
+
+    def classify(self, query: str) -> Optional[str]:
+        text = query.lower()
+        if self._multi_service.search(text):
+            return None
+        strong = []
+        for route, pattern in self._patterns.items():
+            hits = set(pattern.findall(text))
+            if hits and not hits <= self._weak_keywords:
+                strong.append(route)
+        return strong[0] if len(strong) == 1 else None
+
+
+class RoutingStats:
+    def __init__(self):
+        self.routes = Counter()
+
+    def record(self, route: Optional[str]):
+        self.routes[route or COORDINATOR] += 1
+
+    def snapshot(self) -> dict:
+        total = sum(self.routes.values())
+        return {
+            "total": total,
+            "routes": {
+                route: {"count": count, "hit_rate": count / total}
+                for route, count in self.routes.most_common()
+            },
+        }
+
+
+class FastPathRouter:
+    """Wraps a Router with per-route hit counting."""
+
+    def __init__(self, router: Optional[Router]):
+        self.router = router
+        self.stats = RoutingStats()
+
+    def route(self, query: str) -> Optional[str]:
+        route = self.router.classify(query) if self.router is not None else None
+        self.stats.record(route)
+        return route
+
+
+def create_router(name: str = None) -> FastPathRouter:
+    """Builds the pre-router named by FAST_ROUTER.
+
+    "keyword" (default) uses KeywordRouter, "off" sends every query to the
+    coordinator, and "package.module:factory" loads a custom Router.
+    """
+    name = name or os.getenv("FAST_ROUTER", "keyword")
+    if name == "off":
+        return FastPathRouter(None)
+    if name == "keyword":
+        return FastPathRouter(KeywordRouter())
+    module_name, _, factory = name.partition(":")
+    return FastPathRouter(getattr(importlib.import_module(module_name), factory)())
+
+
+class SharedSessionLogFilter(logging.Filter):
+    """Drops ADK's "Event from an unknown agent" warning for events our own runners wrote.
+
+    The fast-path runners and the coordinator share sessions, so each one
+    finds the others' events when picking the agent to run, warns, and falls
+    back to its root agent, which is what we want. Events from authors
+    outside `agent_names` are still reported.
+    """
+
+    def __init__(self, agent_names):
+        super().__init__()
+        self.agent_names = frozenset(agent_names)
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return not (isinstance(record.msg, str) and record.msg.startswith("Event from an unknown agent")
+                    and record.args and record.args[0] in self.agent_names)
+
+
+def hide_shared_session_warnings(agent_names):
+    """Installs SharedSessionLogFilter on the ADK runners logger."""
+    logging.getLogger("google_adk.google.adk.runners").addFilter(SharedSessionLogFilter(agent_names))
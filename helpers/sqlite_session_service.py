@@ -0,0 +1,313 @@
+# helpers/sqlite_session_service.py
+
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Optional
+
+from google.adk.events.event import Event
+from google.adk.sessions import BaseSessionService, Session
+from google.adk.sessions.base_session_service import GetSessionConfig, ListSessionsResponse
+from google.adk.sessions.state import State
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    id TEXT NOT NULL,
+    state TEXT NOT NULL,
+    update_time REAL NOT NULL,
+    PRIMARY KEY (app_name, user_id, id)
+);
+CREATE TABLE IF NOT EXISTS events (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    session_id TEXT NOT NULL,
+    timestamp REAL NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_events_session ON events (app_name, user_id, session_id, seq);
+CREATE TABLE IF NOT EXISTS app_states (
+    app_name TEXT PRIMARY KEY,
+    state TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS user_states (
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    state TEXT NOT NULL,
+    PRIMARY KEY (app_name, user_id)
+);
+"""
+
+
+def _split_state_delta(delta: dict[str, Any]) -> tuple[dict, dict, dict]:
+    app_delta, user_delta, session_delta = {}, {}, {}
+    for key, value in (delta or {}).items():
+        if key.startswith(State.APP_PREFIX):
+            app_delta[key.removeprefix(State.APP_PREFIX)] = value
+        elif key.startswith(State.USER_PREFIX):
+            user_delta[key.removeprefix(State.USER_PREFIX)] = value
+        elif not key.startswith(State.TEMP_PREFIX):
+            session_delta[key] = value
+    return app_delta, user_delta, session_delta
+
+
+class SqliteSessionService(BaseSessionService):
+    """Session service backed by a local SQLite database in WAL mode.
+
+    Several uvicorn workers (or processes on one host) can point at the same
+    file and share sessions. Writes from concurrent requests are group-committed:
+    appends queued while a transaction is running are written together in the
+    next one, and each caller returns once its event is durable. Each write runs
+    in its own savepoint, so one that fails is rolled back and reported to its
+    caller alone.
+    """
+
+    def __init__(self, db_path: str, max_batch: int = 256, read_workers: int = 4):
+        self.db_path = db_path
+        self.max_batch = max_batch
+        self._local = threading.local()
+        self._connections: list[sqlite3.Connection] = []
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="session-writer")
+        self._readers = ThreadPoolExecutor(max_workers=read_workers, thread_name_prefix="session-reader")
+        self._pending: list[tuple] = []
+        self._flusher: Optional[asyncio.Task] = None
+        self.batches = 0
+        self.batched_writes = 0
+
+        self._connection().executescript(SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+            self._connections.append(conn)
+        return conn
+
+    # --- writes ---------------------------------------------------------------
+
+    async def _write(self, op, *args):
+        """Queues `op(conn, *args)` for the next batched transaction and waits for its result."""
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((op, args, future))
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.ensure_future(self._flush())
+        return await future
+
+    async def _flush(self):
+        loop = asyncio.get_running_loop()
+        while self._pending:
+            batch, self._pending = self._pending[:self.max_batch], self._pending[self.max_batch:]
+            try:
+                results = await loop.run_in_executor(self._writer, self._run_batch, [(op, args) for op, args, _ in batch])
+            except Exception as e:
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            self.batches += 1
+            self.batched_writes += len(batch)
+            for (_, _, future), (error, result) in zip(batch, results):
+                if future.done():
+                    continue
+                if error is not None:
+                    future.set_exception(error)
+                else:
+                    future.set_result(result)
+
+    def _run_batch(self, ops) -> list[tuple[Optional[Exception], Any]]:
+        """Runs `ops` in one transaction and returns (error, result) for each."""
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        results = []
+        try:
+            for op, args in ops:
+                conn.execute("SAVEPOINT op")
+                try:
+                    result = op(conn, *args)
+                except Exception as e:
+                    conn.execute("ROLLBACK TO op")
+                    results.append((e, None))
+                else:
+                    results.append((None, result))
+                conn.execute("RELEASE op")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        return results
+
+    @staticmethod
+    def _apply_state_delta(conn, app_name: str, user_id: str, delta: dict) -> dict:
+        """Writes the app: and user: parts of a state delta and returns the session part."""
+        app_delta, user_delta, session_delta = _split_state_delta(delta)
+        if app_delta:
+            row = conn.execute("SELECT state FROM app_states WHERE app_name = ?", (app_name,)).fetchone()
+            conn.execute(
+                "INSERT INTO app_states (app_name, state) VALUES (?, ?) "
+                "ON CONFLICT (app_name) DO UPDATE SET state = excluded.state",
+                (app_name, json.dumps({**(json.loads(row[0]) if row else {}), **app_delta})),
+            )
+        if user_delta:
+            row = conn.execute("SELECT state FROM user_states WHERE app_name = ? AND user_id = ?",
+                               (app_name, user_id)).fetchone()
+            conn.execute(
+                "INSERT INTO user_states (app_name, user_id, state) VALUES (?, ?, ?) "
+                "ON CONFLICT (app_name, user_id) DO UPDATE SET state = excluded.state",
+                (app_name, user_id, json.dumps({**(json.loads(row[0]) if row else {}), **user_delta})),
+            )
+        return session_delta
+
+    def _create_session_op(self, conn, app_name, user_id, session_id, state):
+        session_state = self._apply_state_delta(conn, app_name, user_id, state)
+        conn.execute(
+            "INSERT INTO sessions (app_name, user_id, id, state, update_time) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT DO NOTHING",
+            (app_name, user_id, session_id, json.dumps(session_state), time.time()),
+        )
+
+    def _append_event_op(self, conn, app_name, user_id, session_id, event_json, timestamp, delta):
+        session_delta = self._apply_state_delta(conn, app_name, user_id, delta)
+        row = conn.execute(
+            "SELECT state FROM sessions WHERE app_name = ? AND user_id = ? AND id = ?",
+            (app_name, user_id, session_id),
+        ).fetchone()
+        if row is None:
+            return False
+        state = json.loads(row[0])
+        state.update(session_delta)
+        conn.execute(
+            "UPDATE sessions SET state = ?, update_time = ? WHERE app_name = ? AND user_id = ? AND id = ?",
+            (json.dumps(state), timestamp, app_name, user_id, session_id),
+        )
+        conn.execute(
+            "INSERT INTO events (app_name, user_id, session_id, timestamp, data) VALUES (?, ?, ?, ?, ?)",
+            (app_name, user_id, session_id, timestamp, event_json),
+        )
+        return True
+
+    def _delete_session_op(self, conn, app_name, user_id, session_id):
+        conn.execute("DELETE FROM events WHERE app_name = ? AND user_id = ? AND session_id = ?",
+                     (app_name, user_id, session_id))
+        conn.execute("DELETE FROM sessions WHERE app_name = ? AND user_id = ? AND id = ?",
+                     (app_name, user_id, session_id))
+
+    # --- reads ----------------------------------------------------------------
+
+    async def _read(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._readers, fn, *args)
+
+    def _merged_state(self, conn, app_name: str, user_id: str, session_state: str) -> dict:
+        state = json.loads(session_state)
+        row = conn.execute("SELECT state FROM app_states WHERE app_name = ?", (app_name,)).fetchone()
+        for key, value in (json.loads(row[0]) if row else {}).items():
+            state[State.APP_PREFIX + key] = value
+        row = conn.execute("SELECT state FROM user_states WHERE app_name = ? AND user_id = ?",
+                           (app_name, user_id)).fetchone()
+        for key, value in (json.loads(row[0]) if row else {}).items():
+            state[State.USER_PREFIX + key] = value
+        return state
+
+    def _get_session_sync(self, app_name, user_id, session_id, config) -> Optional[Session]:
+        conn = self._connection()
+        row = conn.execute(
+            "SELECT state, update_time FROM sessions WHERE app_name = ? AND user_id = ? AND id = ?",
+            (app_name, user_id, session_id),
+        ).fetchone()
+        if row is None:
+            return None
+
+        query = "SELECT data FROM events WHERE app_name = ? AND user_id = ? AND session_id = ?"
+        params = [app_name, user_id, session_id]
+        if config and config.after_timestamp:
+            query += " AND timestamp >= ?"
+            params.append(config.after_timestamp)
+        query += " ORDER BY seq DESC"
+        if config and config.num_recent_events:
+            query += " LIMIT ?"
+            params.append(config.num_recent_events)
+        events = [Event.model_validate_json(data) for (data,) in conn.execute(query, params)]
+        events.reverse()
+
+        return Session(
+            app_name=app_name,
+            user_id=user_id,
+            id=session_id,
+            state=self._merged_state(conn, app_name, user_id, row[0]),
+            events=events,
+            last_update_time=row[1],
+        )
+
+    def _list_sessions_sync(self, app_name, user_id) -> ListSessionsResponse:
+        conn = self._connection()
+        rows = conn.execute(
+            "SELECT id, state, update_time FROM sessions WHERE app_name = ? AND user_id = ?",
+            (app_name, user_id),
+        ).fetchall()
+        return ListSessionsResponse(sessions=[
+            Session(app_name=app_name, user_id=user_id, id=session_id,
+                    state=self._merged_state(conn, app_name, user_id, state), last_update_time=update_time)
+            for session_id, state, update_time in rows
+        ])
+
+    # --- BaseSessionService ---------------------------------------------------
+
+    async def create_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        state: Optional[dict[str, Any]] = None,
+        session_id: Optional[str] = None,
+    ) -> Session:
+        session_id = session_id.strip() if session_id and session_id.strip() else str(uuid.uuid4())
+        # Idempotent, so two workers racing to create the same session both succeed.
+        await self._write(self._create_session_op, app_name, user_id, session_id, state or {})
+        return await self.get_session(app_name=app_name, user_id=user_id, session_id=session_id)
+
+    async def get_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        config: Optional[GetSessionConfig] = None,
+    ) -> Optional[Session]:
+        return await self._read(self._get_session_sync, app_name, user_id, session_id, config)
+
+    async def list_sessions(self, *, app_name: str, user_id: str) -> ListSessionsResponse:
+        return await self._read(self._list_sessions_sync, app_name, user_id)
+
+    async def delete_session(self, *, app_name: str, user_id: str, session_id: str) -> None:
+        await self._write(self._delete_session_op, app_name, user_id, session_id)
+
+    async def append_event(self, session: Session, event: Event) -> Event:
+        if event.partial:
+            return event
+        await super().append_event(session=session, event=event)
+        session.last_update_time = event.timestamp
+        delta = event.actions.state_delta if event.actions else {}
+        stored = await self._write(
+            self._append_event_op, session.app_name, session.user_id, session.id,
+            event.model_dump_json(exclude_none=True), event.timestamp, dict(delta or {}),
+        )
+        if not stored:
+            print(f"Failed to append event to session {session.id}: session not found")
+        return event
+
+    async def close(self):
+        if self._flusher is not None:
+            await self._flusher
+        self._writer.shutdown(wait=True)
+        self._readers.shutdown(wait=True)
+        for conn in self._connections:
+            conn.close()
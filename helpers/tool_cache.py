@@ -0,0 +1,124 @@
+# helpers/tool_cache.py
+
+import asyncio
+import functools
+import json
+import os
+from typing import Optional
+
+from cachetools import TTLCache
+
+from helpers.booking_generation import booking_generation
+
+TOOL_CACHE_SIZE = int(os.getenv("TOOL_CACHE_SIZE", "1024"))
+TOOL_CACHE_TTL = float(os.getenv("TOOL_CACHE_TTL", "300"))
+
+# Read-only catalog tools from mcp-toolbox/tools.yaml whose results may be cached.
+CACHEABLE_TOOLS = frozenset({
+    "search-hotels-by-name",
+    "search-hotels-by-location",
+    "search-hotels-by-price-tier",
+    "get-hotel-amenities",
+    "search-flights-by-route",
+    "search-flights-by-airline",
+    "get-available-flights",
+    "search-restaurants-by-cuisine",
+    "search-restaurants-by-location",
+    "get-restaurant-menu",
+    "search-cars-by-location",
+    "search-cars-by-type",
+})
+
+
+def cache_key(tool_name: str, kwargs: dict) -> str:
+    params = {
+        name: value.strip() if isinstance(value, str) else value
+        for name, value in kwargs.items()
+        if value is not None
+    }
+    return tool_name + ":" + json.dumps(params, sort_keys=True, default=str)
+
+
+class ToolResultCache:
+    """LRU+TTL read-through cache for catalog tool results.
+
+    Identical concurrent calls share one request to the toolbox. Every booking
+    tool call bumps the booking generation (helpers/booking_generation.py, see
+    helpers/toolbox.py), and every lookup checks it: once it has moved, on this
+    worker or (within BOOKING_GENERATION_POLL) another one sharing the session
+    database, the cache is cleared, and calls that were already in flight
+    cannot repopulate it with pre-booking results.
+    """
+
+    def __init__(self, maxsize: int = TOOL_CACHE_SIZE, ttl: float = TOOL_CACHE_TTL):
+        self.enabled = maxsize > 0 and ttl > 0
+        self._cache = TTLCache(maxsize=max(maxsize, 1), ttl=ttl)
+        self._inflight: dict[str, asyncio.Future] = {}
+        # Booking generation the cached results were computed in; None until the first lookup.
+        self._generation: Optional[int] = None
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.invalidations = 0
+
+    async def get_or_call(self, key: str, call):
+        generation = await booking_generation.current()
+        if self._generation is None:
+            self._generation = generation
+        elif generation != self._generation:
+            self.invalidate(generation)
+        cached = self._cache.get(key)
+        if cached is not None:
+            self.hits += 1
+            return cached
+
+        future = self._inflight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            return await asyncio.shield(future)
+
+        self.misses += 1
+        future = asyncio.ensure_future(call())
+        self._inflight[key] = future
+        try:
+            result = await asyncio.shield(future)
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+        if generation == await booking_generation.current():
+            self._cache[key] = result
+        return result
+
+    def invalidate(self, generation: int):
+        """Drops everything computed before `generation`."""
+        self._cache.clear()
+        self._inflight.clear()
+        self._generation = generation
+        self.invalidations += 1
+
+    def wrap(self, tool):
+        """Returns `tool` with its calls served from this cache."""
+        name = tool.__name__
+        if not self.enabled or name not in CACHEABLE_TOOLS:
+            return tool
+
+        @functools.wraps(tool)
+        async def call(**kwargs):
+            return await self.get_or_call(cache_key(name, kwargs), lambda: tool(**kwargs))
+
+        call.__signature__ = tool.__signature__
+        return call
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "invalidations": self.invalidations,
+            "hit_rate": (self.hits + self.coalesced) / lookups if lookups else 0.0,
+            "size": len(self._cache),
+        }
+
+
+tool_cache = ToolResultCache()
@@ -0,0 +1,227 @@
+# helpers/toolbox.py
+
+import asyncio
+import functools
+import hashlib
+import json
+import os
+import time
+from types import MappingProxyType
+from typing import Optional
+
+import aiohttp
+from google.adk.agents.readonly_context import ReadonlyContext
+from google.adk.tools.base_tool import BaseTool
+from google.adk.tools.base_toolset import BaseToolset
+from google.adk.tools.function_tool import FunctionTool
+from toolbox_core.protocol import ManifestSchema
+from toolbox_core.tool import ToolboxTool
+
+from helpers.booking_generation import booking_generation
+from helpers.metrics import instrument_tool
+from helpers.result_shaping import shape_results
+from helpers.tool_cache import tool_cache
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TOOLBOX_URL = os.getenv("TOOLBOX_URL", "http://127.0.0.1:5000")
+TOOLBOX_POOL_SIZE = int(os.getenv("TOOLBOX_POOL_SIZE", "50"))
+TOOLBOX_TIMEOUT = float(os.getenv("TOOLBOX_TIMEOUT", "30"))
+TOOLBOX_RETRIES = int(os.getenv("TOOLBOX_RETRIES", "2"))
+TOOLBOX_RETRY_BACKOFF = float(os.getenv("TOOLBOX_RETRY_BACKOFF", "0.2"))
+# "lazy": fetch each toolset when its agent first runs; "eager": fetch all concurrently at startup.
+TOOLBOX_STARTUP_MODE = os.getenv("TOOLBOX_STARTUP_MODE", "lazy")
+TOOLS_YAML_PATH = os.getenv("TOOLS_YAML_PATH", os.path.join(ROOT_DIR, "mcp-toolbox", "tools.yaml"))
+# Set to an empty string to disable the on-disk manifest cache.
+TOOLBOX_MANIFEST_CACHE_DIR = os.getenv("TOOLBOX_MANIFEST_CACHE_DIR", os.path.join(ROOT_DIR, ".toolbox_cache"))
+
+# Tools that change data are never retried: a timed-out call may still have committed.
+WRITE_TOOLS = frozenset({"create-booking", "book-itinerary", "cancel-booking"})
+
+_session: Optional[aiohttp.ClientSession] = None
+_toolsets: dict[str, "SharedToolboxToolset"] = {}
+
+
+def get_session() -> aiohttp.ClientSession:
+    """Returns the pooled HTTP session shared by every toolbox call."""
+    global _session
+    if _session is None:
+        _session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=TOOLBOX_POOL_SIZE, keepalive_timeout=30),
+            timeout=aiohttp.ClientTimeout(total=TOOLBOX_TIMEOUT),
+        )
+    return _session
+
+
+async def close_toolbox():
+    """Closes the pooled session and unloads every toolset, whose tools hold that session."""
+    global _session
+    if _session is not None:
+        await _session.close()
+    _session = None
+    for toolset in _toolsets.values():
+        toolset.unload()
+
+
+def _manifest_cache_path(toolset_name: str) -> Optional[str]:
+    if not TOOLBOX_MANIFEST_CACHE_DIR or not os.path.exists(TOOLS_YAML_PATH):
+        return None
+    with open(TOOLS_YAML_PATH, "rb") as f:
+        tools_hash = hashlib.sha256(f.read()).hexdigest()[:16]
+    return os.path.join(TOOLBOX_MANIFEST_CACHE_DIR, tools_hash, f"{toolset_name}.json")
+
+
+async def fetch_manifest(toolset_name: str) -> tuple[dict, str]:
+    """Returns the toolset manifest and where it came from ("disk" or "network").
+
+    Manifests are cached on disk keyed by a hash of tools.yaml, so restarts and
+    extra workers skip the fetch until the tool definitions change.
+    """
+    cache_path = _manifest_cache_path(toolset_name)
+    if cache_path and os.path.exists(cache_path):
+        with open(cache_path) as f:
+            return json.load(f), "disk"
+
+    async with get_session().get(f"{TOOLBOX_URL}/api/toolset/{toolset_name}") as response:
+        if not response.ok:
+            raise RuntimeError(f"Loading toolset {toolset_name} failed with status {response.status}: {await response.text()}")
+        manifest = await response.json()
+
+    if cache_path:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, cache_path)
+    return manifest, "network"
+
+
+def _build_tools(manifest: dict) -> list[ToolboxTool]:
+    empty = MappingProxyType({})
+    return [
+        ToolboxTool(
+            session=get_session(),
+            base_url=TOOLBOX_URL,
+            name=name,
+            description=schema.description,
+            params=tuple(schema.parameters),
+            required_authn_params=empty,
+            required_authz_tokens=(),
+            auth_service_token_getters=empty,
+            bound_params=empty,
+            client_headers=empty,
+        )
+        for name, schema in ManifestSchema(**manifest).tools.items()
+    ]
+
+
+def _with_timeout_and_retries(tool):
+    """Wraps a toolbox tool with a per-call timeout and, for read-only tools, retries."""
+    retries = 0 if tool.__name__ in WRITE_TOOLS else TOOLBOX_RETRIES
+
+    @functools.wraps(tool)
+    async def call(**kwargs):
+        for attempt in range(retries + 1):
+            try:
+                return await asyncio.wait_for(tool(**kwargs), TOOLBOX_TIMEOUT)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if attempt == retries:
+                    raise
+                await asyncio.sleep(TOOLBOX_RETRY_BACKOFF * 2 ** attempt)
+
+    call.__signature__ = tool.__signature__
+    return call
+
+
+def _bump_booking_generation(tool):
+    """Bumps the booking generation after every write tool call, so no cache serves pre-booking results.
+
+    It runs whether or not the tool result cache is enabled, since the response
+    cache relies on it too, and also after failed calls, which may have committed.
+    """
+    if tool.__name__ not in WRITE_TOOLS:
+        return tool
+
+    @functools.wraps(tool)
+    async def call(**kwargs):
+        try:
+            return await tool(**kwargs)
+        finally:
+            await booking_generation.bump()
+
+    call.__signature__ = tool.__signature__
+    return call
+
+
+def _report_refusals(tool):
+    """Returns a write tool's refusal (e.g. no seats left) to the model as {"error": ...} instead of raising.
+
+    toolbox_core raises a bare Exception carrying the server's error message;
+    connection errors and timeouts still raise, since the write may have committed.
+    """
+    if tool.__name__ not in WRITE_TOOLS:
+        return tool
+
+    @functools.wraps(tool)
+    async def call(**kwargs):
+        try:
+            return await tool(**kwargs)
+        except Exception as e:
+            if type(e) is not Exception:
+                raise
+            return {"error": f"Nothing was booked or changed: {e}"}
+
+    call.__signature__ = tool.__signature__
+    return call
+
+
+class SharedToolboxToolset(BaseToolset):
+    """ADK toolset whose tools call the toolbox server over the shared pooled session.
+
+    The toolset manifest is fetched once, on first use or by preload_toolsets(),
+    and the wrapped tools are reused by every invocation of the owning agent.
+    """
+
+    def __init__(self, toolset_name: str, *, tool_filter=None):
+        super().__init__(tool_filter=tool_filter)
+        self.toolset_name = toolset_name
+        self._tools: Optional[list[BaseTool]] = None
+        self._lock = asyncio.Lock()
+        _toolsets[toolset_name] = self
+
+    async def load(self) -> list[BaseTool]:
+        if self._tools is None:
+            async with self._lock:
+                if self._tools is None:
+                    start = time.perf_counter()
+                    manifest, source = await fetch_manifest(self.toolset_name)
+                    self._tools = [
+                        FunctionTool(instrument_tool(tool_cache.wrap(shape_results(
+                            _report_refusals(_bump_booking_generation(_with_timeout_and_retries(tool)))))))
+                        for tool in _build_tools(manifest)
+                    ]
+                    elapsed_ms = (time.perf_counter() - start) * 1000
+                    print(f"Loaded {self.toolset_name} ({len(self._tools)} tools) from {source} in {elapsed_ms:.1f} ms")
+        return self._tools
+
+    def unload(self):
+        """Drops the built tools; the next load() rebuilds them on the current pooled session."""
+        self._tools = None
+
+    async def get_tools(self, readonly_context: Optional[ReadonlyContext] = None) -> list[BaseTool]:
+        tools = await self.load()
+        return [tool for tool in tools if self._is_tool_selected(tool, readonly_context)]
+
+    async def close(self):
+        # The client is shared across agents and closed with the app (close_toolbox).
+        pass
+
+
+async def preload_toolsets():
+    """Fetches every registered toolset concurrently. Failures are reported and left to lazy loading."""
+    start = time.perf_counter()
+    results = await asyncio.gather(*(toolset.load() for toolset in _toolsets.values()), return_exceptions=True)
+    for name, result in zip(_toolsets, results):
+        if isinstance(result, Exception):
+            print(f"Failed to preload {name}, will retry on first use: {result}")
+    print(f"Preloaded {len(_toolsets)} toolsets in {(time.perf_counter() - start) * 1000:.1f} ms")
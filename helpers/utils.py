@@ -1,11 +1,34 @@
 # helpers/utils.py
 
-from google.adk.sessions import InMemorySessionService
+import os
+import time
+from typing import AsyncIterator, Optional
+
+from google.adk.agents.run_config import RunConfig, StreamingMode
+from google.adk.events.event import Event
+from google.adk.sessions import BaseSessionService
 from google.adk.runners import Runner
 from google.genai import types
 
+from helpers.metrics import phase, record_phase
+
+
+def create_session_service() -> BaseSessionService:
+    """Builds the session service named by SESSION_BACKEND ("memory" or "sqlite").
+
+    Use "sqlite" to share sessions between uvicorn workers; every worker must
+    point SESSION_DB_PATH at the same file. The in-memory backend compacts old
+    turns and evicts idle sessions (see helpers/compaction.py).
+    """
+    backend = os.getenv("SESSION_BACKEND", "memory")
+    if backend == "sqlite":
+        from helpers.sqlite_session_service import SqliteSessionService
+        return SqliteSessionService(os.getenv("SESSION_DB_PATH", "sessions.db"))
+    from helpers.compaction import CompactingInMemorySessionService
+    return CompactingInMemorySessionService()
 
-async def get_or_create_session(session_service: InMemorySessionService, user_id: str, session_id: str) -> str:
+
+async def get_or_create_session(session_service: BaseSessionService, user_id: str, session_id: str) -> str:
     session = await session_service.get_session(app_name="travel_coordinator_agent", user_id=user_id, session_id=session_id)
     if not session:
         print(f"Creating session {session_id} for user {user_id}")
@@ -13,12 +36,62 @@ async def get_or_create_session(session_service: InMemorySessionService, user_id
     return session_id
 
 
-async def process_query(runner: Runner, user_id: str, session_id: str, query: str) -> str:
+async def record_turn(session_service: BaseSessionService, user_id: str, session_id: str, query: str,
+                      response: str, author: str):
+    """Appends a turn answered without running the agents, so follow-up turns still see it."""
+    session = await session_service.get_session(app_name="travel_coordinator_agent", user_id=user_id, session_id=session_id)
+    invocation_id = Event.new_id()
+    for event_author, role, text in (("user", "user", query), (author, "model", response)):
+        await session_service.append_event(session, Event(
+            invocation_id=invocation_id, author=event_author,
+            content=types.Content(role=role, parts=[types.Part(text=text)])))
+
+
+async def process_query(runner: Runner, user_id: str, session_id: str, query: str,
+                        calls: Optional[set] = None) -> str:
+    """Runs one turn and returns the final text. `calls`, if given, collects the tools and agents it called."""
     content = types.Content(role="user", parts=[types.Part(text=query)])
 
     response_text = ""
-    async for event in runner.run_async(user_id=user_id, session_id=session_id, new_message=content):
-        # print(f'event {event}')
-        if event.is_final_response() and event.content and event.content.parts:
-            response_text = event.content.parts[0].text
+    with phase("agent_run"):
+        async for event in runner.run_async(user_id=user_id, session_id=session_id, new_message=content):
+            # print(f'event {event}')
+            if calls is not None:
+                calls.update(call.name for call in event.get_function_calls())
+            if event.is_final_response() and event.content and event.content.parts:
+                response_text = event.content.parts[0].text
     return response_text
+
+
+def event_updates(event: Event) -> list[dict]:
+    """Turns a runner event into the progress updates sent to streaming clients."""
+    updates = []
+    for call in event.get_function_calls():
+        updates.append({"type": "tool_call", "author": event.author, "name": call.name, "args": call.args})
+    for response in event.get_function_responses():
+        updates.append({"type": "tool_result", "author": event.author, "name": response.name})
+    text = "".join(part.text for part in (event.content.parts if event.content else None) or [] if part.text)
+    if text and event.partial:
+        updates.append({"type": "text", "author": event.author, "text": text})
+    elif text and event.is_final_response():
+        updates.append({"type": "final", "author": event.author, "text": text})
+    return updates
+
+
+async def stream_query(runner: Runner, user_id: str, session_id: str, query: str) -> AsyncIterator[dict]:
+    """Like process_query, but yields partial text and tool progress as they happen.
+
+    Closing or cancelling the iterator (e.g. on client disconnect) stops the
+    runner, including any sub-agent and tool calls still in flight.
+    """
+    content = types.Content(role="user", parts=[types.Part(text=query)])
+    events = runner.run_async(user_id=user_id, session_id=session_id, new_message=content,
+                              run_config=RunConfig(streaming_mode=StreamingMode.SSE))
+    start = time.perf_counter()
+    try:
+        async for event in events:
+            for update in event_updates(event):
+                yield update
+    finally:
+        await events.aclose()
+        record_phase("agent_run", time.perf_counter() - start)
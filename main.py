@@ -1,19 +1,34 @@
+import asyncio
+import contextlib
+import json
 import os
+import sys
+import time
 import uuid
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
+from sse_starlette.sse import EventSourceResponse
+from starlette.background import BackgroundTask
 import uvicorn
 from dotenv import load_dotenv
 
 from google.genai import Client
 from google.adk.agents import LlmAgent, SequentialAgent, Agent
 from google.adk.runners import Runner
-from google.adk.sessions import InMemorySessionService
-from firebase.firebase_functions import authenticateUser
-
-from helpers.utils import get_or_create_session, process_query
-from toolbox_core import ToolboxSyncClient
-from google.adk.tools.agent_tool import AgentTool
+from firebase.firebase_functions import authenticateUser, close_auth
+
+from helpers.utils import create_session_service, get_or_create_session, process_query, record_turn, stream_query
+from helpers.router import create_router, hide_shared_session_warnings
+from helpers.tool_cache import tool_cache
+from helpers.toolbox import TOOLBOX_STARTUP_MODE, TOOLS_YAML_PATH, close_toolbox, preload_toolsets
+from helpers.admission import Overloaded, admission, throttle_model_call
+from helpers.batch import BatchRunner
+from helpers.compaction import compact_history, record_usage, session_stats
+from helpers.fanout import BoundedAgentTool
+from helpers.metrics import Gauge, phase, record_model_metrics, registry, start_model_timer
+from helpers.response_cache import ResponseCache, agent_tree_version
 
 from agents.booking_management_agent.agent import booking_management_agent
 from agents.car_rental_agent.agent import car_rental_agent
@@ -26,15 +41,13 @@ load_dotenv()
 
 # Configure the client - this sets up authentication globally
 Client(api_key=os.getenv("GOOGLE_API_KEY"))
-toolbox = ToolboxSyncClient("http://127.0.0.1:5000")
-tools = toolbox.load_toolset('hotels_toolset')
 
 # --- Agent setup ----------------------------------------------------------
-booking_management_tool = AgentTool(booking_management_agent)
-car_rental_tool = AgentTool(car_rental_agent)
-flights_tool = AgentTool(flights_agent)
-hotels_tool = AgentTool(hotels_agent)
-restaurants_tool = AgentTool(restaurants_agent)
+booking_management_tool = BoundedAgentTool(booking_management_agent)
+car_rental_tool = BoundedAgentTool(car_rental_agent)
+flights_tool = BoundedAgentTool(flights_agent)
+hotels_tool = BoundedAgentTool(hotels_agent)
+restaurants_tool = BoundedAgentTool(restaurants_agent)
 
 root_agent = Agent(
     name="travel_coordinator_agent",
@@ -78,8 +91,8 @@ root_agent = Agent(
 
 **BOOKING QUERIES** - Use `booking_management_tools` when users ask about:
 - Keywords: "book", "booking", "reserve", "reservation", "cancel", "confirm", "customer", "my bookings"
-- Examples: "Book this hotel", "Cancel my reservation", "Show my bookings", "Create a booking for John"
-- Actions: Create, retrieve, or cancel bookings
+- Examples: "Book this hotel", "Book the hotel, flight and car for my trip", "Cancel my reservation", "Show my bookings", "Create a booking for John"
+- Actions: Create, retrieve, or cancel bookings; book a whole itinerary in one request
 
 **DECISION FRAMEWORK:**
 1. **Primary Intent Recognition**: Identify the main service requested (hotel, flight, restaurant, car, booking)
@@ -90,9 +103,10 @@ root_agent = Agent(
 **COMPLEX QUERY HANDLING:**
 For queries involving multiple services (e.g., "Plan a trip to Paris with hotel and flights"):
 1. Break down the query into component parts
-2. Use multiple tools in logical sequence
-3. Coordinate results to provide comprehensive travel plans
-4. Ensure all aspects of the request are addressed
+2. Call all independent tools together in the same step so they run in parallel (e.g. hotels, flights and restaurants for one destination)
+3. Only wait for one tool before calling another when it needs that result (e.g. search before booking)
+4. Coordinate results to provide comprehensive travel plans
+5. Ensure all aspects of the request are addressed
 
 **RESPONSE GUIDELINES:**
 - Always confirm what service you're helping with
@@ -110,7 +124,7 @@ Query: "Book a flight from Chicago to Miami on December 15th"
 → Route to: `flights_tools` (search by route + date) + `booking_management_tools` (create booking)
 
 Query: "I need a complete trip to San Francisco - hotel, flight, and restaurant recommendations"
-→ Route to: `hotels_tools` + `flights_tools` + `restaurants_tools` (coordinate all three)
+→ Route to: `hotels_tools` + `flights_tools` + `restaurants_tools` (call all three at once, then coordinate)
 
 Query: "Cancel booking ID 12345"
 → Route to: `booking_management_tools` (cancel booking)
@@ -130,15 +144,37 @@ Use your natural language understanding to interpret user intent accurately and
     ),
     tools=[booking_management_tool, car_rental_tool,
            flights_tool, hotels_tool, restaurants_tool],
+    before_model_callback=[compact_history, throttle_model_call, start_model_timer],
+    after_model_callback=[record_usage, record_model_metrics],
 )
 
-session_service = InMemorySessionService()
+session_service = create_session_service()
 runner = Runner(
     agent=root_agent,
     app_name="travel_coordinator_agent",
     session_service=session_service
 )
 
+# Unambiguous single-domain queries skip the coordinator and go straight to the specialist.
+# The runners share the coordinator's app_name so a session keeps one history whichever agent answers.
+router = create_router()
+specialist_runners = {
+    agent.name: Runner(agent=agent, app_name="travel_coordinator_agent", session_service=session_service)
+    for agent in [booking_management_agent, car_rental_agent, flights_agent, hotels_agent, restaurants_agent]
+}
+hide_shared_session_warnings([root_agent.name, *specialist_runners])
+
+# First-turn answers, reused across users while RESPONSE_CACHE_TTL is set. Booking turns are never cached.
+response_cache = ResponseCache(agent_tree_version(root_agent, TOOLS_YAML_PATH),
+                               skip=frozenset({booking_management_agent.name}))
+
+batch_runner = BatchRunner(
+    authenticate=authenticateUser,
+    session_service=session_service,
+    pick_runner=lambda query: specialist_runners.get(router.route(query), runner),
+    admit=admission.admit,
+)
+
 # --- Request/Response models ----------------------------------------------
 
 
@@ -155,25 +191,158 @@ class QueryResponse(BaseModel):
 
 
 # --- FastAPI app ----------------------------------------------------------
-app = FastAPI(title="ADK Agent API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if TOOLBOX_STARTUP_MODE == "eager":
+        await preload_toolsets()
+    yield
+    await close_toolbox()
+    await close_auth()
+    if hasattr(session_service, "close"):
+        await session_service.close()
 
 
-@app.post("/query", response_model=QueryResponse)
-async def query_agent(req: QueryRequest):
+app = FastAPI(title="ADK Agent API", lifespan=lifespan)
+
+
+@app.exception_handler(Overloaded)
+async def overloaded_handler(request: Request, exc: Overloaded):
+    """Shed requests fail fast with 429 (this user has too many in flight) or 503 (server busy)."""
+    return JSONResponse({"detail": f"Overloaded: {exc.reason}"}, status_code=exc.status_code,
+                        headers={"Retry-After": str(exc.retry_after)})
+
+
+async def prepare_query(req: QueryRequest) -> tuple[str, str, Runner]:
+    """Authenticates the caller, resolves the session and picks the runner for the query."""
     phone_number = req.phone_number
     print(f"Phone number: {phone_number}")
 
-    user_id = await authenticateUser(phone_number)
+    with phase("auth"):
+        user_id = await authenticateUser(phone_number)
     print(f"Authenticated user_id: {user_id}")
 
     session_id = req.session_id or f"session_{uuid.uuid4().hex[:8]}"
-    session_id = await get_or_create_session(session_service, user_id, session_id)
+    with phase("session"):
+        session_id = await get_or_create_session(session_service, user_id, session_id)
+
+    with phase("route"):
+        route = router.route(req.query)
+    print(f"Route: {route or root_agent.name}")
+    return user_id, session_id, specialist_runners.get(route, runner)
 
-    response_text = await process_query(runner, user_id, session_id, req.query)
+
+@app.post("/query", response_model=QueryResponse)
+async def query_agent(req: QueryRequest):
+    with phase("request"):
+        user_id, session_id, query_runner = await prepare_query(req)
+
+        async def run() -> tuple[str, set, float]:
+            calls = set()
+            async with admission.admit(user_id, session_id):
+                start = time.perf_counter()
+                response_text = await process_query(query_runner, user_id, session_id, req.query, calls)
+                return response_text, calls, time.perf_counter() - start
+
+        if req.session_id:
+            response_text, _, _ = await run()
+        else:
+            response_text, cached = await response_cache.get_or_run(req.query, query_runner.agent.name, run)
+            if cached:
+                await record_turn(session_service, user_id, session_id, req.query, response_text,
+                                  author=query_runner.agent.name)
 
     return QueryResponse(user_id=user_id, session_id=session_id, response=response_text or "No response from agent.")
 
 
+@app.post("/query/stream")
+async def query_agent_stream(req: QueryRequest):
+    user_id, session_id, query_runner = await prepare_query(req)
+    # Admitted before the response starts, so a shed request still gets a plain 429/503.
+    admitted = contextlib.AsyncExitStack()
+    await admitted.enter_async_context(admission.admit(user_id, session_id))
+
+    async def events():
+        async with admitted:
+            yield {"event": "session", "data": json.dumps({"user_id": user_id, "session_id": session_id})}
+            async for update in stream_query(query_runner, user_id, session_id, req.query):
+                yield {"event": update["type"], "data": json.dumps(update, default=str)}
+            yield {"event": "done", "data": "{}"}
+
+    # sse-starlette cancels events() when the client disconnects, which stops the runner. If that happens
+    # before events() has started, only the background task releases the slot (closing twice is a no-op).
+    return EventSourceResponse(events(), background=BackgroundTask(admitted.aclose))
+
+
+@app.post("/query/batch")
+async def query_agent_batch(request: Request):
+    """Accepts JSONL QueryRequest items and streams JSONL results back as they finish."""
+    # The body is read up front: StreamingResponse listens on the same receive channel for disconnects.
+    lines = (await request.body()).decode().splitlines()
+
+    async def results():
+        async for result in batch_runner.run(lines):
+            yield json.dumps(result) + "\n"
+
+    return StreamingResponse(results(), media_type="application/x-ndjson")
+
+
+@app.get("/router/stats")
+async def router_stats():
+    return router.stats.snapshot()
+
+
+@app.get("/tools/cache/stats")
+async def tool_cache_stats():
+    return tool_cache.stats()
+
+
+@app.get("/responses/cache/stats")
+async def response_cache_stats():
+    return response_cache.stats()
+
+
+@app.get("/sessions/stats")
+async def sessions_stats():
+    return session_stats.snapshot()
+
+
+@app.get("/admission/stats")
+async def admission_stats():
+    return admission.stats()
+
+
+registry.register(Gauge("tool_cache_hit_ratio", "Share of catalog tool calls served from the cache.",
+                        lambda: tool_cache.stats()["hit_rate"]))
+registry.register(Gauge("tool_cache_entries", "Catalog tool results currently cached.",
+                        lambda: tool_cache.stats()["size"]))
+registry.register(Gauge("response_cache_hit_ratio", "Share of first-turn queries answered from the response cache.",
+                        lambda: response_cache.stats()["hit_rate"]))
+registry.register(Gauge("response_cache_entries", "First-turn answers currently cached.",
+                        lambda: response_cache.stats()["size"]))
+registry.register(Gauge("sessions_tracked", "Sessions with memory and prompt statistics.",
+                        lambda: len(session_stats.snapshot()["per_session"])))
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus text exposition of the phase, model and tool metrics."""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
+async def run_batch_file(input_path: str, output_path: str):
+    """Offline replay: `python main.py batch requests.jsonl [results.jsonl]`."""
+    async with lifespan(app):
+        with open(input_path) as lines, (open(output_path, "w") if output_path != "-" else contextlib.nullcontext(sys.stdout)) as out:
+            # Keep progress prints off stdout when results are written there.
+            with contextlib.redirect_stdout(sys.stderr):
+                async for result in batch_runner.run(lines):
+                    out.write(json.dumps(result) + "\n")
+                    out.flush()
+
+
 # --- Run app ---
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    if sys.argv[1:2] == ["batch"]:
+        asyncio.run(run_batch_file(sys.argv[2], sys.argv[3] if len(sys.argv) > 3 else "-"))
+    else:
+        uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -173,14 +173,91 @@ INSERT INTO bookings (customer_name, booking_type, service_id, booking_date, tot
 ('David Brown', 'hotel', 5, '2025-10-19', 899.99, 'pending');
 
 -- Create indexes for better performance
-CREATE INDEX idx_hotels_location ON hotels(location);
+-- The tools search with ILIKE '%' || $1 || '%', which a plain btree index cannot serve;
+-- trigram GIN indexes can (for search terms of 3 or more characters).
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX idx_hotels_name_trgm ON hotels USING gin (name gin_trgm_ops);
+CREATE INDEX idx_hotels_location_trgm ON hotels USING gin (location gin_trgm_ops);
 CREATE INDEX idx_hotels_price_tier ON hotels(price_tier);
-CREATE INDEX idx_flights_departure_city ON flights(departure_city);
-CREATE INDEX idx_flights_arrival_city ON flights(arrival_city);
+CREATE INDEX idx_flights_departure_city_trgm ON flights USING gin (departure_city gin_trgm_ops);
+CREATE INDEX idx_flights_arrival_city_trgm ON flights USING gin (arrival_city gin_trgm_ops);
+CREATE INDEX idx_flights_airline_trgm ON flights USING gin (airline gin_trgm_ops);
+-- search-flights-by-route filters on a departure_time range, so this index applies
 CREATE INDEX idx_flights_departure_time ON flights(departure_time);
-CREATE INDEX idx_restaurants_location ON restaurants(location);
-CREATE INDEX idx_restaurants_cuisine_type ON restaurants(cuisine_type);
-CREATE INDEX idx_rental_cars_pickup_location ON rental_cars(pickup_location);
+CREATE INDEX idx_restaurants_location_trgm ON restaurants USING gin (location gin_trgm_ops);
+CREATE INDEX idx_restaurants_cuisine_type_trgm ON restaurants USING gin (cuisine_type gin_trgm_ops);
+CREATE INDEX idx_menu_items_restaurant_id ON menu_items(restaurant_id);
+CREATE INDEX idx_rental_cars_pickup_location_trgm ON rental_cars USING gin (pickup_location gin_trgm_ops);
 CREATE INDEX idx_rental_cars_vehicle_type ON rental_cars(vehicle_type);
-CREATE INDEX idx_bookings_customer_name ON bookings(customer_name);
-CREATE INDEX idx_bookings_booking_type ON bookings(booking_type);
\ No newline at end of file
+-- get-customer-bookings: exact (case-insensitive) name match, already in booking_date order
+CREATE INDEX idx_bookings_customer_date ON bookings(lower(customer_name), booking_date DESC);
+-- ...and its partial-name fallback
+CREATE INDEX idx_bookings_customer_name_trgm ON bookings USING gin (customer_name gin_trgm_ops);
+CREATE INDEX idx_bookings_booking_type ON bookings(booking_type);
+-- Books several services for one customer in a single transaction (book-itinerary, create-booking).
+-- Flight seats and rental cars are locked in id order, so concurrent itineraries queue behind each
+-- other instead of deadlocking, then checked and reserved; all bookings go in with one INSERT.
+-- Any unavailable or unknown item raises, which rolls back the whole itinerary.
+CREATE OR REPLACE FUNCTION book_itinerary(
+    p_customer_name TEXT,
+    p_booking_types TEXT[],
+    p_service_ids INTEGER[],
+    p_booking_dates TEXT[],
+    p_total_amounts NUMERIC[]
+) RETURNS SETOF bookings AS $$
+DECLARE
+    items_count INTEGER := coalesce(cardinality(p_booking_types), 0);
+    flight_ids INTEGER[] := ARRAY(
+        SELECT s FROM unnest(p_booking_types, p_service_ids) AS i(t, s) WHERE t = 'flight');
+    car_ids INTEGER[] := ARRAY(
+        SELECT s FROM unnest(p_booking_types, p_service_ids) AS i(t, s) WHERE t = 'car_rental');
+    problem TEXT;
+BEGIN
+    IF items_count = 0
+       OR coalesce(cardinality(p_service_ids), 0) <> items_count
+       OR coalesce(cardinality(p_booking_dates), 0) <> items_count
+       OR coalesce(cardinality(p_total_amounts), 0) <> items_count THEN
+        RAISE EXCEPTION 'An itinerary needs one booking type, service id, date and amount per item';
+    END IF;
+
+    PERFORM 1 FROM flights WHERE id = ANY(flight_ids) ORDER BY id FOR UPDATE;
+    PERFORM 1 FROM rental_cars WHERE id = ANY(car_ids) ORDER BY id FOR UPDATE;
+
+    SELECT string_agg(format('flight %s', d.id), ', ') INTO problem
+    FROM (SELECT id, count(*) AS seats FROM unnest(flight_ids) AS id GROUP BY id) d
+    LEFT JOIN flights f ON f.id = d.id
+    WHERE f.id IS NULL OR f.available_seats < d.seats;
+    IF problem IS NOT NULL THEN
+        RAISE EXCEPTION 'Not enough seats left on %', problem;
+    END IF;
+
+    SELECT string_agg(format('car %s', d.id), ', ') INTO problem
+    FROM (SELECT id, count(*) AS cars FROM unnest(car_ids) AS id GROUP BY id) d
+    LEFT JOIN rental_cars c ON c.id = d.id
+    WHERE c.id IS NULL OR NOT c.available OR d.cars > 1;
+    IF problem IS NOT NULL THEN
+        RAISE EXCEPTION 'No longer available: %', problem;
+    END IF;
+
+    SELECT string_agg(format('%s %s', i.t, i.s), ', ') INTO problem
+    FROM unnest(p_booking_types, p_service_ids) AS i(t, s)
+    WHERE (i.t = 'hotel' AND NOT EXISTS (SELECT 1 FROM hotels WHERE id = i.s))
+       OR (i.t = 'restaurant' AND NOT EXISTS (SELECT 1 FROM restaurants WHERE id = i.s));
+    IF problem IS NOT NULL THEN
+        RAISE EXCEPTION 'Unknown %', problem;
+    END IF;
+
+    UPDATE flights f SET available_seats = f.available_seats - d.seats
+    FROM (SELECT id, count(*) AS seats FROM unnest(flight_ids) AS id GROUP BY id) d
+    WHERE f.id = d.id;
+    UPDATE rental_cars SET available = FALSE WHERE id = ANY(car_ids);
+
+    RETURN QUERY
+    INSERT INTO bookings (customer_name, booking_type, service_id, booking_date, total_amount, status)
+    SELECT p_customer_name, i.booking_type, i.service_id, i.booking_date::date, i.total_amount, 'confirmed'
+    FROM unnest(p_booking_types, p_service_ids, p_booking_dates, p_total_amounts)
+        AS i(booking_type, service_id, booking_date, total_amount)
+    RETURNING *;
+END;
+$$ LANGUAGE plpgsql;